@@ -15,30 +15,68 @@ Mark-and-Sweep GC Visualizer
 import json
 import sys
 import os
-import re
+import mmap
 from pathlib import Path
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from typing import Dict, List, Tuple, Optional, Set
+from array import array
+from bisect import bisect_left
 from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 import math
 
 try:
+    import numpy as np
     import matplotlib.pyplot as plt
+    import matplotlib.colors as mcolors
     import matplotlib.patches as patches
     from matplotlib.animation import FuncAnimation
     from matplotlib.widgets import Button, Slider
     import networkx as nx
 except ImportError:
     print("ERROR: Required packages not installed!")
-    print("Install with: pip install matplotlib networkx")
+    print("Install with: pip install numpy matplotlib networkx")
     sys.exit(1)
 
 
+# Интервал (в шагах) между полными снимками heap'а для get_state()
+CHECKPOINT_INTERVAL = 256
+
+# Логи от этого размера (байт) разбираются параллельно в пуле процессов
+PARALLEL_PARSE_MIN_BYTES = 50 * 1024 * 1024
+# На сколько кусков на процесс делится такой лог (для выравнивания нагрузки)
+PARALLEL_CHUNKS_PER_WORKER = 4
+
+# Начальная ёмкость SoA-массивов объектов (растёт удвоением)
+ARRAY_INITIAL_CAPACITY = 64
+
+# Раскладка графа: root объекты в верхнем ряду, остальные в нижнем
+ROOT_ROW_Y = 2
+ROOT_SPACING = 2
+OTHER_ROW_Y = 0
+OTHER_SPACING = 1.5
+
+# Сколько раскладок (по составу рядов root/остальных) хранить в кэше
+POS_CACHE_SIZE = 256
+
+# Задержка (мс) кадра, запрошенного виджетом на паузе
+REDRAW_DELAY = 1
+
+# Коды статуса узла - номера строк таблицы цветов (порядок как в _STATUS_COLORS)
+STATUS_ROOT = 0
+STATUS_MARKED = 1
+STATUS_ALIVE = 2
+STATUS_DEAD = 3
+STATUS_CURRENT = 4
+_STATUS_COLORS = ('root', 'marked', 'alive', 'dead', 'current')
+
+
 # ===========================
 # СТРУКТУРЫ ДАННЫХ
 # ===========================
 
-@dataclass
+@dataclass(slots=True)
 class GCObject:
     """Представляет объект на heap'е"""
     id: int
@@ -48,21 +86,261 @@ class GCObject:
     is_alive: bool = True
     allocation_step: int = -1
     collection_step: int = -1
-    references_to: Set[int] = field(default_factory=set)
-    references_from: Set[int] = field(default_factory=set)
+    # Исходящие ссылки - отсортированный array('i') без повторов. Входящие ссылки
+    # не хранятся: при необходимости выводятся из references_to
+    references_to: array = field(default_factory=lambda: array('i'))
 
 
-@dataclass
+@dataclass(slots=True)
 class VisualizationState:
     """Состояние визуализации на определённом шаге"""
     step_number: int
     operation_type: str  # allocate, add_ref, remove_ref, make_root, collect, mark, sweep
     operation_description: str
-    objects: Dict[int, GCObject]
     phase: str = "idle"  # idle, marking, sweeping
-    marked_objects: Set[int] = field(default_factory=set)
+    # Изменение heap'а на этом шаге: ('alloc', id, size), ('add_ref', from, to), ...;
+    # подряд идущие mark/sweep собираются в один шаг: ('mark', id1, id2, ...)
+    delta: Tuple = ()
     deleted_objects: Set[int] = field(default_factory=set)
     current_marking: Optional[int] = None  # Текущий объект при DFS
+    # Счётчики heap'а после этого шага (считаются при парсинге)
+    alive_count: int = 0
+    root_count: int = 0
+    marked_count: int = 0
+    total_bytes: int = 0
+    # Счётчики (живых, root, помеченных, байт) после каждого объекта серии
+    # mark/sweep - для режима Detail, без пересчёта по всему heap'у
+    substep_counts: List[Tuple[int, int, int, int]] = field(default_factory=list)
+
+
+# ===========================
+# ПАРСИНГ ЛОГОВ
+# ===========================
+
+# Строки лога имеют фиксированную грамматику "[Step N] OP obj_A ...", поэтому
+# разбираются через startswith/split без регулярных выражений
+_STEP_PREFIX = '[Step '
+
+
+def _obj_id(token: str) -> Optional[int]:
+    """id из токена вида 'obj_N' (None, если токен другой)"""
+    digits = token[4:]
+    if token.startswith('obj_') and digits.isdecimal():
+        return int(digits)
+    return None
+
+
+def _touched_ids(delta: Tuple) -> Tuple[int, ...]:
+    """id объектов, статус которых меняет шаг"""
+    return delta[1:] if delta[0] in ('mark', 'sweep') else delta[1:2]
+
+
+def _can_merge(last: VisualizationState, step: int, delta: Tuple) -> bool:
+    """Можно ли добавить mark/sweep к предыдущему шагу того же типа"""
+    kind = delta[0]
+    if kind != last.delta[0] or kind not in ('mark', 'sweep'):
+        return False
+    # Пометка и удаление в рамках одной сборки идут на одном шаге; строки
+    # соседних шагов не склеиваются - иначе у удалённых объектов потеряется
+    # свой collection_step (серия применяется с номером шага состояния)
+    return step == last.step_number
+
+
+def _add_reference(refs: array, obj_id: int):
+    """Добавить id в отсортированный массив ссылок (если его там нет)"""
+    i = bisect_left(refs, obj_id)
+    if i == len(refs) or refs[i] != obj_id:
+        refs.insert(i, obj_id)
+
+
+def _remove_reference(refs: array, obj_id: int):
+    """Удалить id из отсортированного массива ссылок (если он там есть)"""
+    i = bisect_left(refs, obj_id)
+    if i < len(refs) and refs[i] == obj_id:
+        del refs[i]
+
+
+def _has_reference(refs: array, obj_id: int) -> bool:
+    """Есть ли id в отсортированном массиве ссылок"""
+    i = bisect_left(refs, obj_id)
+    return i < len(refs) and refs[i] == obj_id
+
+
+def _object_stats(obj: Optional[GCObject]) -> Tuple[int, int, int, int]:
+    """Вклад объекта в счётчики: (живой, живой root, помечен, байт)"""
+    if obj is None:
+        return 0, 0, 0, 0
+    alive = int(obj.is_alive)
+    return alive, alive & int(obj.is_root), int(obj.is_marked), obj.size * alive
+
+
+def _parse_allocate(parts: List[str]) -> Optional[Tuple]:
+    # ALLOCATE: obj_N (size=M bytes)
+    if len(parts) < 3 or not parts[2].startswith('(size='):
+        return None
+    obj_id = _obj_id(parts[1])
+    size_text = parts[2][6:].rstrip(')')
+    if obj_id is None or not size_text.isdecimal():
+        return None
+    return ('alloc', obj_id, int(size_text))
+
+
+def _parse_make_root(parts: List[str]) -> Optional[Tuple]:
+    # MAKE_ROOT: obj_N is now a root object
+    obj_id = _obj_id(parts[1]) if len(parts) > 1 else None
+    if obj_id is None:
+        return None
+    return ('make_root', obj_id)
+
+
+def _parse_add_ref(parts: List[str]) -> Optional[Tuple]:
+    # ADD_REF: obj_A -> obj_B
+    if len(parts) < 4 or parts[2] != '->':
+        return None
+    from_id = _obj_id(parts[1])
+    to_id = _obj_id(parts[3])
+    if from_id is None or to_id is None:
+        return None
+    return ('add_ref', from_id, to_id)
+
+
+def _parse_remove_ref(parts: List[str]) -> Optional[Tuple]:
+    # REM_REF: obj_A -X-> obj_B
+    if len(parts) < 4 or parts[2] != '-X->':
+        return None
+    from_id = _obj_id(parts[1])
+    to_id = _obj_id(parts[3])
+    if from_id is None or to_id is None:
+        return None
+    return ('remove_ref', from_id, to_id)
+
+
+def _parse_mark(parts: List[str]) -> Optional[Tuple]:
+    # Mark obj_N
+    obj_id = _obj_id(parts[1]) if len(parts) > 1 else None
+    if obj_id is None:
+        return None
+    return ('mark', obj_id)
+
+
+def _parse_sweep(parts: List[str]) -> Optional[Tuple]:
+    # Deleted obj_N (M bytes)
+    obj_id = _obj_id(parts[1]) if len(parts) > 1 else None
+    if obj_id is None:
+        return None
+    return ('sweep', obj_id)
+
+
+# Первый токен операции -> разбор строки. Строки вида "ADD_REF FAILED: ..."
+# или "ADD_REF SKIPPED: ..." не совпадают ни с одним ключом и пропускаются
+_OP_HANDLERS = {
+    'ALLOCATE:': _parse_allocate,
+    'MAKE_ROOT:': _parse_make_root,
+    'ADD_REF:': _parse_add_ref,
+    'REM_REF:': _parse_remove_ref,
+    'Mark': _parse_mark,
+    'Deleted': _parse_sweep,
+}
+
+
+def _parse_line(line: str) -> Optional[Tuple[int, Tuple]]:
+    """Разобрать строку формата "[Step N] ..." в (номер шага, изменение heap'а)"""
+    line = line.strip()
+    if not line.startswith(_STEP_PREFIX):
+        return None
+    end = line.find(']', len(_STEP_PREFIX))
+    step_text = line[len(_STEP_PREFIX):end]
+    if end < 0 or not step_text.isdecimal():
+        return None
+
+    parts = line[end + 1:].split()
+    handler = _OP_HANDLERS.get(parts[0]) if parts else None
+    if handler is None:
+        return None
+
+    delta = handler(parts)
+    if delta is None:
+        return None
+    return int(step_text), delta
+
+
+def _parse_chunk(path: str, start: int, end: int) -> List[Tuple[int, Tuple]]:
+    """
+    Разобрать байты [start, end) файла лога (границы - по концам строк)
+
+    Выполняется в процессе-воркере: возвращает только компактные кортежи
+    (номер шага, изменение), состояния строятся в главном процессе.
+    """
+    with open(path, 'rb') as f:
+        f.seek(start)
+        text = f.read(end - start).decode('utf-8')
+
+    parsed = []
+    for line in text.split('\n'):
+        item = _parse_line(line)
+        if item is not None:
+            parsed.append(item)
+    return parsed
+
+
+def _make_state(step: int, delta: Tuple) -> VisualizationState:
+    """Состояние визуализации для одного изменения heap'а"""
+    kind = delta[0]
+
+    if kind == 'alloc':
+        return VisualizationState(
+            step_number=step,
+            operation_type='allocate',
+            operation_description=f'Allocated object_{delta[1]} ({delta[2]} bytes)',
+            phase='idle',
+            delta=delta
+        )
+
+    if kind == 'make_root':
+        return VisualizationState(
+            step_number=step,
+            operation_type='make_root',
+            operation_description=f'Made object_{delta[1]} a root',
+            phase='idle',
+            delta=delta
+        )
+
+    if kind == 'add_ref':
+        return VisualizationState(
+            step_number=step,
+            operation_type='add_ref',
+            operation_description=f'Added reference: object_{delta[1]} → object_{delta[2]}',
+            phase='idle',
+            delta=delta
+        )
+
+    if kind == 'remove_ref':
+        return VisualizationState(
+            step_number=step,
+            operation_type='remove_ref',
+            operation_description=f'Removed reference: object_{delta[1]} -X-> object_{delta[2]}',
+            phase='idle',
+            delta=delta
+        )
+
+    if kind == 'mark':
+        return VisualizationState(
+            step_number=step,
+            operation_type='mark',
+            operation_description=f'Marked object_{delta[1]} as reachable',
+            phase='marking',
+            delta=delta,
+            current_marking=delta[1]
+        )
+
+    return VisualizationState(
+        step_number=step,
+        operation_type='sweep',
+        operation_description=f'Deleted object_{delta[1]}',
+        phase='sweeping',
+        delta=delta,
+        deleted_objects={delta[1]}
+    )
 
 
 class MarkSweepVisualizer:
@@ -77,6 +355,9 @@ class MarkSweepVisualizer:
         """
         self.log_file_path = log_file_path
         self.states: List[VisualizationState] = []
+        self._checkpoints: List[Dict[int, GCObject]] = []
+        self._cached_index = -1
+        self._cached_objects: Dict[int, GCObject] = {}
         self.current_state_index = 0
         self.is_playing = False
         self.animation_speed = 500  # Миллисекунды между кадрами
@@ -89,8 +370,62 @@ class MarkSweepVisualizer:
             'dead': '#D3D3D3',          # Серый для удалённых
             'reference': '#2C3E50',     # Тёмный синий для ссылок
             'marked_reference': '#F39C12', # Оранжевый для ссылок помеченных объектов
+            'current': '#FFD700',       # Жёлтый для текущего объекта при DFS
         }
 
+        # Показываемый шаг агрегированной серии mark/sweep (None - вся серия)
+        self.show_substeps = False
+        self.substep_index: Optional[int] = None
+
+        # Индекс шага, под который сейчас заполнены граф, SoA-массивы и строки
+        # OBJECT DETAILS (-1 - пустой heap, None - требуется полная перестройка),
+        # и показанный под-шаг его серии mark/sweep (None - вся серия)
+        self._rendered_index: Optional[int] = -1
+        self._rendered_substep: Optional[int] = None
+        # (шаг, под-шаг, режим Detail) последнего нарисованного кадра
+        self._last_rendered: Optional[Tuple[int, Optional[int], bool]] = None
+        # Объекты показанного под-шага: неизменённые объекты общие с get_state()
+        self._substep_objects: Dict[int, GCObject] = {}
+
+        # Закэшированный граф последнего отрисованного шага
+        self._graph = nx.DiGraph()
+        self._pos: Dict[int, Tuple[float, float]] = {}
+        self._pos_cache: Dict[Tuple[frozenset, frozenset], Dict[int, Tuple[float, float]]] = {}
+        self._graph_version = 0  # Увеличивается при каждом изменении топологии
+
+        # Artist'ы, переиспользуемые между кадрами (blit)
+        self._node_artist = None
+        self._edge_artists: List = []
+        self._label_artists: Dict = {}
+        self._drawn_version = -1
+        self._title_text = None
+        self._info_text = None
+        self._blit_artists: List = []
+
+        # Строки блока OBJECT DETAILS по объектам для последнего показанного шага
+        self._detail_lines: Dict[int, str] = {}
+        # Склеенный блок OBJECT DETAILS (None - строки изменились, склеить заново)
+        self._details_text: Optional[str] = ''
+
+        # RGBA цветов узлов, индексируется кодом статуса STATUS_*
+        self._status_rgba = mcolors.to_rgba_array([self.colors[name] for name in _STATUS_COLORS])
+        # RGBA цветов рёбер: [0] - обычная ссылка, [1] - ссылка помеченного объекта
+        self._edge_rgba = mcolors.to_rgba_array([self.colors['reference'],
+                                                 self.colors['marked_reference']])
+
+        # Поля объектов показанного шага в виде SoA-массивов (индекс - _id_to_idx)
+        self._id_to_idx: Dict[int, int] = {}
+        self._is_alive = np.zeros(ARRAY_INITIAL_CAPACITY, dtype=bool)
+        self._is_root = np.zeros(ARRAY_INITIAL_CAPACITY, dtype=bool)
+        self._is_marked = np.zeros(ARRAY_INITIAL_CAPACITY, dtype=bool)
+        self._size = np.zeros(ARRAY_INITIAL_CAPACITY, dtype=np.int64)
+        # Индексы узлов и источников рёбер в порядке нарисованных artist'ов
+        self._node_idx = np.zeros(0, dtype=np.intp)
+        self._edge_src_idx = np.zeros(0, dtype=np.intp)
+        self._edge_dst_idx = np.zeros(0, dtype=np.intp)
+        # Индекс в _edge_rgba, которым окрашен каждый artist ребра (-1 - ещё не окрашен)
+        self._edge_color_idx = np.zeros(0, dtype=np.intp)
+
         self.fig = None
         self.ax_graph = None
         self.ax_info = None
@@ -107,149 +442,167 @@ class MarkSweepVisualizer:
             print(f"ERROR: Log file not found: {self.log_file_path}")
             return False
 
+        # Начальное состояние
+        current_objects: Dict[int, GCObject] = {}
+        alive_count = root_count = marked_count = total_bytes = 0
+        self.states = []
+        self._checkpoints = []
+        self._cached_index = -1
+        self._cached_objects = {}
+
         try:
-            with open(self.log_file_path, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
-        except Exception as e:
+            for step, delta in self._iter_deltas():
+                if self.states and _can_merge(self.states[-1], step, delta):
+                    # Серия Mark/Deleted - один агрегированный шаг
+                    merged = self.states[-1]
+                    merged.delta += delta[1:]
+                    count = len(merged.delta) - 1
+                    if delta[0] == 'mark':
+                        merged.current_marking = delta[1]
+                        merged.operation_description = f'Marked {count} objects as reachable'
+                    else:
+                        merged.deleted_objects.add(delta[1])
+                        merged.operation_description = f'Deleted {count} objects'
+                else:
+                    # Предыдущий шаг больше не изменится - можно снять снимок
+                    self._maybe_checkpoint(current_objects)
+                    merged = _make_state(step, delta)
+                    self.states.append(merged)
+
+                # Применить изменение к единственному рабочему словарю объектов.
+                # Каждая строка лога меняет статус не более чем одного объекта - delta[1]
+                obj_id = delta[1]
+                alive0, root0, marked0, bytes0 = _object_stats(current_objects.get(obj_id))
+                self._apply_delta(current_objects, delta, step)
+                alive1, root1, marked1, bytes1 = _object_stats(current_objects.get(obj_id))
+
+                alive_count += alive1 - alive0
+                root_count += root1 - root0
+                marked_count += marked1 - marked0
+                total_bytes += bytes1 - bytes0
+                merged.alive_count = alive_count
+                merged.root_count = root_count
+                merged.marked_count = marked_count
+                merged.total_bytes = total_bytes
+                if merged.delta[0] in ('mark', 'sweep'):
+                    merged.substep_counts.append(
+                        (alive_count, root_count, marked_count, total_bytes))
+        except (OSError, UnicodeDecodeError) as e:
             print(f"ERROR: Cannot read log file: {e}")
             return False
 
-        # Начальное состояние
-        current_objects: Dict[int, GCObject] = {}
-        current_step = 0
-
-        for line in lines:
-            line = line.strip()
-            if not line or line.startswith('==='):
-                continue
-
-            # Парсить строку формата "[Step N] ..."
-            match = re.match(r'\[Step (\d+)\]\s+(.*)', line)
-            if not match:
-                continue
-
-            step = int(match.group(1))
-            operation_text = match.group(2)
-
-            current_step = step
-
-            # ===== ALLOCATE =====
-            if operation_text.startswith('ALLOCATE:') and 'FAILED' not in operation_text:
-                match = re.match(r'ALLOCATE:\s+obj_(\d+)\s+\(size=(\d+)', operation_text)
-                if match:
-                    obj_id = int(match.group(1))
-                    size = int(match.group(2))
-                    
-                    obj = GCObject(id=obj_id, size=size, allocation_step=step)
-                    current_objects[obj_id] = obj
-
-                    state = VisualizationState(
-                        step_number=step,
-                        operation_type='allocate',
-                        operation_description=f'Allocated object_{obj_id} ({size} bytes)',
-                        objects={k: self._copy_object(v) for k, v in current_objects.items()},
-                        phase='idle'
-                    )
-                    self.states.append(state)
-
-            # ===== MAKE_ROOT =====
-            elif 'MAKE_ROOT:' in operation_text and 'FAILED' not in operation_text:
-                match = re.match(r'MAKE_ROOT:\s+obj_(\d+)', operation_text)
-                if match:
-                    obj_id = int(match.group(1))
-                    if obj_id in current_objects:
-                        current_objects[obj_id].is_root = True
-
-                    state = VisualizationState(
-                        step_number=step,
-                        operation_type='make_root',
-                        operation_description=f'Made object_{obj_id} a root',
-                        objects={k: self._copy_object(v) for k, v in current_objects.items()},
-                        phase='idle'
-                    )
-                    self.states.append(state)
-
-            # ===== ADD_REF =====
-            elif operation_text.startswith('ADD_REF:') and 'FAILED' not in operation_text and 'SKIPPED' not in operation_text:
-                match = re.match(r'ADD_REF:\s+obj_(\d+)\s+->\s+obj_(\d+)', operation_text)
-                if match:
-                    from_id = int(match.group(1))
-                    to_id = int(match.group(2))
-
-                    if from_id in current_objects and to_id in current_objects:
-                        current_objects[from_id].references_to.add(to_id)
-                        current_objects[to_id].references_from.add(from_id)
-
-                    state = VisualizationState(
-                        step_number=step,
-                        operation_type='add_ref',
-                        operation_description=f'Added reference: object_{from_id} → object_{to_id}',
-                        objects={k: self._copy_object(v) for k, v in current_objects.items()},
-                        phase='idle'
-                    )
-                    self.states.append(state)
-
-            # ===== REMOVE_REF =====
-            elif operation_text.startswith('REM_REF:') and 'FAILED' not in operation_text:
-                match = re.match(r'REM_REF:\s+obj_(\d+)\s+-X->\s+obj_(\d+)', operation_text)
-                if match:
-                    from_id = int(match.group(1))
-                    to_id = int(match.group(2))
-
-                    if from_id in current_objects and to_id in current_objects:
-                        current_objects[from_id].references_to.discard(to_id)
-                        current_objects[to_id].references_from.discard(from_id)
-
-                    state = VisualizationState(
-                        step_number=step,
-                        operation_type='remove_ref',
-                        operation_description=f'Removed reference: object_{from_id} -X-> object_{to_id}',
-                        objects={k: self._copy_object(v) for k, v in current_objects.items()},
-                        phase='idle'
-                    )
-                    self.states.append(state)
-
-            # ===== MARK PHASE =====
-            elif 'Mark obj_' in operation_text:
-                match = re.match(r'Mark\s+obj_(\d+)', operation_text)
-                if match:
-                    obj_id = int(match.group(1))
-                    if obj_id in current_objects:
-                        current_objects[obj_id].is_marked = True
-
-                    state = VisualizationState(
-                        step_number=step,
-                        operation_type='mark',
-                        operation_description=f'Marked object_{obj_id} as reachable',
-                        objects={k: self._copy_object(v) for k, v in current_objects.items()},
-                        phase='marking',
-                        marked_objects={k for k, v in current_objects.items() if v.is_marked},
-                        current_marking=obj_id
-                    )
-                    self.states.append(state)
-
-            # ===== DELETED =====
-            elif operation_text.startswith('Deleted obj_'):
-                match = re.match(r'Deleted obj_(\d+)', operation_text)
-                if match:
-                    obj_id = int(match.group(1))
-                    if obj_id in current_objects:
-                        current_objects[obj_id].is_alive = False
-                        current_objects[obj_id].collection_step = step
-
-                    state = VisualizationState(
-                        step_number=step,
-                        operation_type='sweep',
-                        operation_description=f'Deleted object_{obj_id}',
-                        objects={k: self._copy_object(v) for k, v in current_objects.items()},
-                        phase='sweeping',
-                        deleted_objects={obj_id}
-                    )
-                    self.states.append(state)
+        self._maybe_checkpoint(current_objects)
 
         print(f"✓ Parsed {len(self.states)} visualization states")
         return len(self.states) > 0
 
+    def _iter_deltas(self):
+        """
+        Пары (номер шага, изменение heap'а) распознанных строк лога по порядку
+
+        Большой лог делится по концам строк на куски, которые разбираются
+        параллельно в пуле процессов; состояния затем строятся одним
+        последовательным проходом в parse_logs().
+        """
+        size = os.path.getsize(self.log_file_path)
+        workers = os.cpu_count() or 1
+
+        if size < PARALLEL_PARSE_MIN_BYTES or workers < 2:
+            # Читать файл построчно, не загружая его целиком в память
+            with open(self.log_file_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    item = _parse_line(line)
+                    if item is not None:
+                        yield item
+            return
+
+        bounds = self._chunk_bounds(size, workers * PARALLEL_CHUNKS_PER_WORKER)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # map возвращает результаты кусков в исходном порядке
+            for chunk in pool.map(_parse_chunk, repeat(self.log_file_path),
+                                  bounds[:-1], bounds[1:]):
+                yield from chunk
+
+    def _chunk_bounds(self, size: int, count: int) -> List[int]:
+        """Смещения начала count кусков файла лога (и его конец), по концам строк"""
+        bounds = [0]
+        with open(self.log_file_path, 'rb') as f, \
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for k in range(1, count):
+                pos = mm.find(b'\n', max(size * k // count, bounds[-1]))
+                if pos < 0:
+                    break
+                bounds.append(pos + 1)
+        bounds.append(size)
+        return bounds
+
+    def _maybe_checkpoint(self, objects: Dict[int, GCObject]):
+        """Снять снимок heap'а, если последний шаг попадает на границу интервала"""
+        if self.states and (len(self.states) - 1) % CHECKPOINT_INTERVAL == 0:
+            self._checkpoints.append(self._snapshot(objects))
+
+    @staticmethod
+    def _apply_delta(objects: Dict[int, GCObject], delta: Tuple, step: int):
+        """Применить изменение шага step к словарю объектов (на месте)"""
+        kind = delta[0]
+
+        if kind == 'alloc':
+            obj_id, size = delta[1], delta[2]
+            objects[obj_id] = GCObject(id=obj_id, size=size, allocation_step=step)
+
+        elif kind == 'make_root':
+            if delta[1] in objects:
+                objects[delta[1]].is_root = True
+
+        elif kind == 'add_ref':
+            from_id, to_id = delta[1], delta[2]
+            if from_id in objects and to_id in objects:
+                _add_reference(objects[from_id].references_to, to_id)
+
+        elif kind == 'remove_ref':
+            from_id, to_id = delta[1], delta[2]
+            if from_id in objects and to_id in objects:
+                _remove_reference(objects[from_id].references_to, to_id)
+
+        elif kind == 'mark':
+            for obj_id in delta[1:]:
+                if obj_id in objects:
+                    objects[obj_id].is_marked = True
+
+        elif kind == 'sweep':
+            for obj_id in delta[1:]:
+                if obj_id in objects:
+                    objects[obj_id].is_alive = False
+                    objects[obj_id].collection_step = step
+
+    def _snapshot(self, objects: Dict[int, GCObject]) -> Dict[int, GCObject]:
+        """Создать независимую копию словаря объектов"""
+        return {k: self._copy_object(v) for k, v in objects.items()}
+
+    def get_state(self, index: int) -> Dict[int, GCObject]:
+        """
+        Восстановить объекты heap'а после шага index
+
+        Берётся ближайший снимок (или последнее восстановленное состояние,
+        если оно ближе), и к нему применяются изменения последующих шагов.
+
+        Returns:
+            Словарь объектов; не изменять - он переиспользуется между вызовами
+        """
+        checkpoint = index // CHECKPOINT_INTERVAL
+        base_index = checkpoint * CHECKPOINT_INTERVAL
+
+        if not (base_index <= self._cached_index <= index):
+            self._cached_objects = self._snapshot(self._checkpoints[checkpoint])
+            self._cached_index = base_index
+
+        for i in range(self._cached_index + 1, index + 1):
+            state = self.states[i]
+            self._apply_delta(self._cached_objects, state.delta, state.step_number)
+        self._cached_index = index
+
+        return self._cached_objects
+
     def _copy_object(self, obj: GCObject) -> GCObject:
         """Создать копию объекта"""
         return GCObject(
@@ -260,8 +613,7 @@ class MarkSweepVisualizer:
             is_alive=obj.is_alive,
             allocation_step=obj.allocation_step,
             collection_step=obj.collection_step,
-            references_to=obj.references_to.copy(),
-            references_from=obj.references_from.copy()
+            references_to=obj.references_to[:]
         )
 
     def build_graph(self, objects: Dict[int, GCObject]) -> Tuple[nx.DiGraph, Dict]:
@@ -276,7 +628,7 @@ class MarkSweepVisualizer:
         # Добавить узлы
         for obj_id, obj in objects.items():
             if obj.is_alive:
-                G.add_node(obj_id, obj=obj)
+                G.add_node(obj_id)
 
         # Добавить рёбра (ссылки)
         for obj_id, obj in objects.items():
@@ -285,35 +637,135 @@ class MarkSweepVisualizer:
                     if target_id in objects and objects[target_id].is_alive:
                         G.add_edge(obj_id, target_id)
 
-        # Расположить узлы
-        if len(G.nodes()) > 0:
-            # Иерархическое расположение: root вверху, остальные внизу
-            root_objects = [oid for oid, obj in objects.items() 
-                          if obj.is_root and obj.is_alive]
-            other_objects = [oid for oid, obj in objects.items() 
-                           if not obj.is_root and obj.is_alive]
+        return G, self._layout(objects)
 
+    def _layout(self, objects: Dict[int, GCObject]) -> Dict[int, Tuple[float, float]]:
+        """
+        Позиции живых узлов: иерархически, root вверху, остальные внизу.
+        Зависят только от состава рядов - один и тот же шаг раскладывается
+        одинаково, как бы к нему ни пришли (проигрыванием или слайдером)
+        """
+        root_objects = frozenset(oid for oid, obj in objects.items()
+                                 if obj.is_root and obj.is_alive)
+        other_objects = frozenset(oid for oid, obj in objects.items()
+                                  if not obj.is_root and obj.is_alive)
+
+        # Раскладка зависит только от состава рядов - переиспользовать её
+        key = (root_objects, other_objects)
+        pos = self._pos_cache.get(key)
+        if pos is None:
             pos = {}
 
-            # Root объекты в верхней части
-            for i, obj_id in enumerate(root_objects):
-                x = (i - len(root_objects) / 2) * 2
-                pos[obj_id] = (x, 2)
+            # Root объекты в верхней части (порядок по id - раскладка стабильна)
+            for i, obj_id in enumerate(sorted(root_objects)):
+                x = (i - len(root_objects) / 2) * ROOT_SPACING
+                pos[obj_id] = (x, ROOT_ROW_Y)
 
             # Остальные объекты в нижней части
             num_other = len(other_objects)
-            for i, obj_id in enumerate(other_objects):
-                x = (i - num_other / 2) * 1.5
-                y = 0
-                pos[obj_id] = (x, y)
-
-            # Если граф пуст, использовать пустую позицию
-            if len(pos) == 0:
-                pos = {}
+            for i, obj_id in enumerate(sorted(other_objects)):
+                x = (i - num_other / 2) * OTHER_SPACING
+                pos[obj_id] = (x, OTHER_ROW_Y)
+
+            if len(self._pos_cache) >= POS_CACHE_SIZE:
+                del self._pos_cache[next(iter(self._pos_cache))]
+            self._pos_cache[key] = pos
+
+        return pos
+
+    def _sync_arrays(self, state: VisualizationState, objects: Dict[int, GCObject], forward: bool):
+        """
+        Синхронизировать SoA-массивы с объектами показываемого шага
+
+        При шаге вперёд обновляются только объекты, изменённые шагом; иначе
+        массивы заполняются заново. Соответствие id -> индекс не меняется,
+        поэтому индексы узлов остаются валидными.
+        """
+        if forward:
+            for obj_id in _touched_ids(state.delta):
+                if obj_id in objects:
+                    self._store_object(objects[obj_id])
         else:
-            pos = {}
+            self._is_alive[:] = False
+            self._is_root[:] = False
+            self._is_marked[:] = False
+            self._size[:] = 0
+            for obj in objects.values():
+                self._store_object(obj)
+
+    def _store_object(self, obj: GCObject):
+        """Записать поля объекта в SoA-массивы"""
+        idx = self._id_to_idx.get(obj.id)
+        if idx is None:
+            idx = len(self._id_to_idx)
+            if idx == len(self._is_alive):
+                self._grow_arrays()
+            self._id_to_idx[obj.id] = idx
+
+        self._is_alive[idx] = obj.is_alive
+        self._is_root[idx] = obj.is_root
+        self._is_marked[idx] = obj.is_marked
+        self._size[idx] = obj.size
+
+    def _grow_arrays(self):
+        """Удвоить ёмкость SoA-массивов"""
+        for name in ('_is_alive', '_is_root', '_is_marked', '_size'):
+            arr = getattr(self, name)
+            setattr(self, name, np.concatenate([arr, np.zeros_like(arr)]))
+
+    def _sync_graph(self, state: VisualizationState, objects: Dict[int, GCObject], forward: bool):
+        """
+        Синхронизировать закэшированный граф с показываемым шагом
+
+        При шаге вперёд применяется только изменение этого шага; иначе
+        граф строится заново.
+        """
+        if forward:
+            self._apply_graph_delta(state, objects)
+            return
 
-        return G, pos
+        self._graph, self._pos = self.build_graph(objects)
+        self._graph_version += 1
+
+    def _apply_graph_delta(self, state: VisualizationState, objects: Dict[int, GCObject]):
+        """Обновить закэшированный граф изменением одного шага (mark ничего не меняет)"""
+        G = self._graph
+        kind = state.delta[0]
+        if kind != 'mark':
+            self._graph_version += 1
+
+        if kind == 'alloc':
+            obj_id = state.delta[1]
+            # Новый объект с тем же id не унаследовал исходящие ссылки
+            if obj_id in G:
+                G.remove_edges_from(list(G.out_edges(obj_id)))
+            G.add_node(obj_id)
+            # ...но живые объекты могут всё ещё ссылаться на этот id
+            for src_id, src in objects.items():
+                if src.is_alive and _has_reference(src.references_to, obj_id):
+                    G.add_edge(src_id, obj_id)
+            self._pos = self._layout(objects)
+
+        elif kind == 'make_root':
+            obj_id = state.delta[1]
+            if obj_id in G and self._pos[obj_id][1] != ROOT_ROW_Y:
+                self._pos = self._layout(objects)
+
+        elif kind == 'add_ref':
+            from_id, to_id = state.delta[1], state.delta[2]
+            if from_id in G and to_id in G:
+                G.add_edge(from_id, to_id)
+
+        elif kind == 'remove_ref':
+            from_id, to_id = state.delta[1], state.delta[2]
+            if G.has_edge(from_id, to_id):
+                G.remove_edge(from_id, to_id)
+
+        elif kind == 'sweep':
+            swept = [obj_id for obj_id in state.delta[1:] if obj_id in G]
+            if swept:
+                G.remove_nodes_from(swept)
+                self._pos = self._layout(objects)
 
     def create_figure(self):
         """Создать matplotlib фигуру с интерактивными элементами"""
@@ -322,17 +774,36 @@ class MarkSweepVisualizer:
 
         # Главный граф
         self.ax_graph = plt.subplot(1, 2, 1)
-        self.ax_graph.set_title('Heap Graph Visualization')
-        self.ax_graph.set_aspect('equal')
+        self.ax_graph.axis('off')
+        # Границы осей не меняются между кадрами: иначе FuncAnimation
+        # сохраняет фон для blit заново - вместе с предыдущим кадром.
+        # Равный масштаб осей держится размером области, а не границами
+        self.ax_graph.set_aspect('equal', adjustable='box')
+        self.ax_graph.set_xlim(*self._graph_xlim(), auto=False)
+        self.ax_graph.set_ylim(OTHER_ROW_Y - 1, ROOT_ROW_Y + 1, auto=False)
+        # Заголовок внутри осей: при blit обновляется только область осей.
+        # Анимированные artist'ы (animated=True) не попадают в полную
+        # перерисовку, а значит и в фон, который сохраняет blit
+        self._title_text = self.ax_graph.text(
+            0.5, 0.98, 'Heap Graph Visualization', transform=self.ax_graph.transAxes,
+            ha='center', va='top', fontsize=12, fontweight='bold', animated=True
+        )
 
         # Информация справа
         self.ax_info = plt.subplot(1, 2, 2)
         self.ax_info.axis('off')
+        self._info_text = self.ax_info.text(
+            0.05, 0.95, '', transform=self.ax_info.transAxes,
+            fontsize=9, verticalalignment='top', fontfamily='monospace',
+            bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.3),
+            clip_on=True, animated=True
+        )
 
         # Кнопки управления внизу
         ax_play = plt.axes([0.35, 0.05, 0.1, 0.04])
         ax_pause = plt.axes([0.47, 0.05, 0.1, 0.04])
         ax_reset = plt.axes([0.59, 0.05, 0.1, 0.04])
+        ax_detail = plt.axes([0.71, 0.05, 0.1, 0.04])
 
         btn_play = Button(ax_play, 'Play')
         btn_pause = Button(ax_pause, 'Pause')
@@ -342,6 +813,10 @@ class MarkSweepVisualizer:
         btn_pause.on_clicked(self._on_pause)
         btn_reset.on_clicked(self._on_reset)
 
+        # Детализация агрегированных серий mark/sweep по объектам
+        self.btn_detail = Button(ax_detail, 'Detail')
+        self.btn_detail.on_clicked(self._on_detail)
+
         # Слайдер для выбора шага
         ax_slider = plt.axes([0.2, 0.12, 0.6, 0.02])
         self.slider = Slider(
@@ -349,89 +824,332 @@ class MarkSweepVisualizer:
             valinit=0, valstep=1
         )
         self.slider.on_changed(self._on_slider_change)
+        self.slider.ax.set_animated(True)
+        # Слайдеры рисуются кадром анимации (blit), без полной перерисовки фигуры
+        self.slider.drawon = False
+
+        # Слайдер под-шагов внутри агрегированной серии (работает в режиме Detail)
+        ax_substep = plt.axes([0.2, 0.095, 0.6, 0.015])
+        self.substep_slider = Slider(
+            ax_substep, 'Sub-step', 0, 1, valinit=0, valstep=1
+        )
+        self.substep_slider.on_changed(self._on_substep_change)
+        self.substep_slider.ax.set_animated(True)
+        self.substep_slider.drawon = False
 
         plt.tight_layout(rect=[0, 0.15, 1, 0.96])
 
+    def _graph_xlim(self) -> Tuple[float, float]:
+        """Границы оси x графа, вмещающие самые широкие ряды за всю запись"""
+        max_roots = max((state.root_count for state in self.states), default=0)
+        max_other = max((state.alive_count - state.root_count for state in self.states), default=0)
+
+        left = right = 0.0
+        for count, spacing in ((max_roots, ROOT_SPACING), (max_other, OTHER_SPACING)):
+            if count:
+                left = min(left, -count / 2 * spacing)
+                right = max(right, (count / 2 - 1) * spacing)
+        return left - 1, right + 1
+
     def _on_play(self, event):
         """Нажата кнопка Play"""
         self.is_playing = True
+        if self.anim is not None:
+            self.anim.event_source.interval = self.animation_speed
+            self.anim.event_source.start()
 
     def _on_pause(self, event):
         """Нажата кнопка Pause"""
         self.is_playing = False
+        if self.anim is not None:
+            self.anim.event_source.stop()
 
     def _on_reset(self, event):
         """Нажата кнопка Reset"""
+        self.is_playing = False
         self.current_state_index = 0
         self.slider.set_val(0)
-        self.is_playing = False
+
+    def _on_detail(self, event):
+        """Нажата кнопка Detail: включить/выключить показ серий по объектам"""
+        self.show_substeps = not self.show_substeps
+        self.substep_index = None
+        self._request_frame()
 
     def _on_slider_change(self, val):
         """Слайдер изменился"""
         self.current_state_index = int(val)
+        self.substep_index = None
+        self._request_frame()
+
+    def _on_substep_change(self, val):
+        """Слайдер под-шагов изменился"""
+        self.substep_index = int(val)
+        self._request_frame()
+
+    def _request_frame(self):
+        """
+        Нарисовать один кадр после действия пользователя: на паузе таймер
+        анимации остановлен, кадр запускает его, и _update_frame снова его останавливает
+        """
+        if self.anim is None:
+            return
+        if not self.is_playing:
+            self.anim.event_source.interval = REDRAW_DELAY
+        self.anim.event_source.start()
+
+    def _draw_graph_artists(self, G: nx.DiGraph, pos: Dict):
+        """Пересоздать artist'ы графа после изменения топологии"""
+        if self._node_artist is not None:
+            self._node_artist.remove()
+        for artist in self._edge_artists:
+            artist.remove()
+        for artist in self._label_artists.values():
+            artist.remove()
+
+        self._node_artist = None
+        self._edge_artists = []
+        self._label_artists = {}
+
+        if len(G) > 0:
+            self._node_artist = nx.draw_networkx_nodes(
+                G, pos, ax=self.ax_graph, node_size=1500, alpha=0.9
+            )
+            self._label_artists = nx.draw_networkx_labels(
+                G, pos, ax=self.ax_graph, font_size=10, font_weight='bold'
+            )
+            self._edge_artists = list(nx.draw_networkx_edges(
+                G, pos, ax=self.ax_graph,
+                arrows=True, arrowsize=20, arrowstyle='->', width=2, alpha=0.7
+            ) or [])
+
+            # Новые artist'ы сразу анимированные - до ближайшей полной перерисовки
+            self._node_artist.set_animated(True)
+            for artist in self._edge_artists:
+                artist.set_animated(True)
+            for artist in self._label_artists.values():
+                artist.set_animated(True)
+
+        self._node_idx = np.array([self._id_to_idx[n] for n in G.nodes()], dtype=np.intp)
+        self._edge_src_idx = np.array([self._id_to_idx[u] for u, _ in G.edges()], dtype=np.intp)
+        self._edge_dst_idx = np.array([self._id_to_idx[v] for _, v in G.edges()], dtype=np.intp)
+        self._edge_color_idx = np.full(len(self._edge_src_idx), -1, dtype=np.intp)
+
+        self._drawn_version = self._graph_version
+
+    def _sync_details(self, state: VisualizationState, objects: Dict[int, GCObject], forward: bool):
+        """
+        Синхронизировать строки блока OBJECT DETAILS с показываемым шагом
+
+        При шаге вперёд переформатируются только строки объектов, изменённых
+        этим шагом; иначе все строки строятся заново.
+        """
+        if forward:
+            for obj_id in _touched_ids(state.delta):
+                self._format_detail_line(objects, obj_id)
+        else:
+            self._detail_lines = {}
+            for obj_id in objects:
+                self._format_detail_line(objects, obj_id)
+        self._details_text = None
+
+    def _format_detail_line(self, objects: Dict[int, GCObject], obj_id: int):
+        """Обновить строку объекта в блоке OBJECT DETAILS"""
+        obj = objects.get(obj_id)
+        if obj is None or not obj.is_alive:
+            self._detail_lines.pop(obj_id, None)
+            return
+
+        status = []
+        if obj.is_root:
+            status.append('ROOT')
+        if obj.is_marked:
+            status.append('MARKED')
+        status_str = ' | '.join(status) if status else 'UNMARKED'
+
+        line = f"\nobject_{obj_id}: {obj.size} bytes [{status_str}]"
+        if len(obj.references_to) > 0:
+            refs = ', '.join(f"obj_{r}" for r in obj.references_to)
+            line += f"\n  → {refs}"
+        self._detail_lines[obj_id] = line
+
+    def _burst_length(self, index: int) -> int:
+        """Число объектов в агрегированной серии mark/sweep шага index (иначе 1)"""
+        if not self.states:
+            return 1
+        return len(_touched_ids(self.states[index].delta))
+
+    def _sync_substep_slider(self, burst: int):
+        """Подстроить диапазон и значение слайдера под-шагов под текущую серию"""
+        last = max(burst - 1, 1)
+        if self.substep_slider.valmax != last:
+            self.substep_slider.valmax = last
+            self.substep_slider.ax.set_xlim(0, last)
+
+        value = burst - 1 if self.substep_index is None else self.substep_index
+        if self.substep_slider.val != value:
+            self.substep_slider.drawon = False
+            self.substep_slider.eventson = False
+            self.substep_slider.set_val(value)
+            self.substep_slider.eventson = True
+            self.substep_slider.drawon = True
+
+    def _substep_view(self, index: int, substep: int) -> VisualizationState:
+        """Состояние агрегированного шага index после первых substep + 1 объектов серии"""
+        state = self.states[index]
+        kind = state.delta[0]
+        ids = state.delta[1:substep + 2]
+        total = len(state.delta) - 1
+
+        view = replace(state, delta=(kind,) + ids)
+        if kind == 'mark':
+            view.current_marking = ids[-1]
+            view.operation_description = f'Marked object_{ids[-1]} as reachable ({substep + 1}/{total})'
+        else:
+            view.deleted_objects = set(ids)
+            view.operation_description = f'Deleted object_{ids[-1]} ({substep + 1}/{total})'
+
+        # Счётчики посчитаны при парсинге
+        (view.alive_count, view.root_count,
+         view.marked_count, view.total_bytes) = state.substep_counts[substep]
+        return view
+
+    def _view_objects(self, index: int, substep: Optional[int]) -> Tuple[Dict[int, GCObject], Optional[Tuple]]:
+        """
+        Объекты показываемого (под-)шага и их изменение относительно отрисованного
+
+        Если показываемое положение продолжает отрисованное (следующий шаг или
+        следующие объекты той же серии), возвращается только новая часть
+        изменения - кэши отрисовки обновляются инкрементально.
+
+        Returns:
+            (объекты, изменение для кэшей или None - кэши нужно перестроить)
+        """
+        state = self.states[index]
+        kind = state.delta[0]
+        rendered_index, rendered_substep = self._rendered_index, self._rendered_substep
+
+        # Сколько объектов серии уже отражено в кэшах (None - продолжения нет)
+        if rendered_index is not None and rendered_index == index - 1 and rendered_substep is None:
+            start = 0
+        elif (rendered_index == index and rendered_substep is not None
+              and (substep is None or rendered_substep <= substep)):
+            start = rendered_substep + 1
+        else:
+            start = None
+
+        if substep is None:
+            objects = self.get_state(index)
+            if start is None:
+                return objects, None
+            return objects, state.delta if start == 0 else (kind,) + state.delta[start + 1:]
+
+        if not start:
+            # Начать серию заново от heap'а предыдущего шага
+            objects = dict(self.get_state(index - 1)) if index > 0 else {}
+            applied = 0
+        else:
+            objects = self._substep_objects
+            applied = start
+
+        # Изменяемые объекты копируются: остальные общие с get_state()
+        ids = state.delta[1 + applied:substep + 2]
+        for obj_id in ids:
+            if obj_id in objects:
+                objects[obj_id] = self._copy_object(objects[obj_id])
+        self._apply_delta(objects, (kind,) + ids, state.step_number)
+        self._substep_objects = objects
+
+        return objects, None if start is None else (kind,) + state.delta[1 + start:substep + 2]
 
     def _update_frame(self, frame_num):
-        """Обновить фрейм анимации"""
-        if self.is_playing and self.current_state_index < len(self.states) - 1:
-            self.current_state_index += 1
-            self.slider.set_val(self.current_state_index)
+        """Обновить фрейм анимации; возвращает изменённые artist'ы для blit"""
+        if self.is_playing:
+            burst = self._burst_length(self.current_state_index)
+            if (self.show_substeps and self.substep_index is not None
+                    and self.substep_index < burst - 1):
+                # В режиме детализации серия mark/sweep проигрывается по объекту
+                self.substep_index += 1
+            elif self.current_state_index < len(self.states) - 1:
+                self.current_state_index += 1
+                # Слайдер перерисовывается через blit; обработчик не нужен -
+                # кадр и так рисуется
+                self.slider.eventson = False
+                self.slider.set_val(self.current_state_index)
+                self.slider.eventson = True
+                self.substep_index = 0 if self.show_substeps else None
 
         if self.current_state_index >= len(self.states):
             self.current_state_index = len(self.states) - 1
 
-        self.ax_graph.clear()
-        self.ax_info.clear()
+        # На паузе и в конце записи новых кадров нет - остановить таймер,
+        # чтобы он не будил анимацию впустую (кадры запрашивают виджеты)
+        at_end = (self.current_state_index >= len(self.states) - 1
+                  and (not self.show_substeps or self.substep_index is None
+                       or self.substep_index >= self._burst_length(self.current_state_index) - 1))
+        if self.anim is not None and (not self.is_playing or at_end):
+            self.anim.event_source.stop()
+
+        # Показываемое не изменилось - вернуть те же artist'ы: пустой список
+        # заставил бы FuncAnimation перерисовать всю фигуру
+        shown = (self.current_state_index, self.substep_index, self.show_substeps)
+        if shown == self._last_rendered:
+            return self._blit_artists
+        self._last_rendered = shown
 
         if len(self.states) == 0:
-            self.ax_graph.text(0.5, 0.5, 'No data', ha='center', va='center')
-            return
-
-        state = self.states[self.current_state_index]
+            self._title_text.set_text('No data')
+            self._blit_artists = [self._title_text]
+            return self._blit_artists
+
+        index = self.current_state_index
+        burst = self._burst_length(index)
+        self._sync_substep_slider(burst)
+
+        if (self.show_substeps and self.substep_index is not None
+                and self.substep_index < burst - 1):
+            substep = self.substep_index
+            state = self._substep_view(index, substep)
+        else:
+            substep = None
+            state = self.states[index]
+
+        # === Синхронизировать кэши отрисовки с показываемым шагом ===
+        objects, delta = self._view_objects(index, substep)
+        if (index, substep) != (self._rendered_index, self._rendered_substep):
+            forward = delta is not None
+            sync_state = replace(state, delta=delta) if forward else state
+            self._sync_arrays(sync_state, objects, forward)
+            self._sync_graph(sync_state, objects, forward)
+            self._sync_details(sync_state, objects, forward)
+            self._rendered_index = index
+            self._rendered_substep = substep
 
         # === Рисовать граф ===
-        G, pos = self.build_graph(state.objects)
-
-        # Цвета узлов
-        node_colors = []
-        for node_id in G.nodes():
-            obj = state.objects[node_id]
-            if obj.is_root:
-                node_colors.append(self.colors['root'])
-            elif obj.is_marked:
-                node_colors.append(self.colors['marked'])
-            elif node_id == state.current_marking:
-                node_colors.append('#FFD700')  # Жёлтый для текущего
-            else:
-                node_colors.append(self.colors['alive'])
-
-        # Рисовать рёбра
-        edge_colors = []
-        for edge in G.edges():
-            from_id, to_id = edge
-            from_obj = state.objects[from_id]
-            if from_obj.is_marked:
-                edge_colors.append(self.colors['marked_reference'])
-            else:
-                edge_colors.append(self.colors['reference'])
-
-        # Рисовать граф
-        nx.draw_networkx_nodes(
-            G, pos, ax=self.ax_graph, node_color=node_colors,
-            node_size=1500, alpha=0.9
-        )
-        nx.draw_networkx_labels(
-            G, pos, ax=self.ax_graph, font_size=10, font_weight='bold'
-        )
-        nx.draw_networkx_edges(
-            G, pos, ax=self.ax_graph, edge_color=edge_colors,
-            arrows=True, arrowsize=20, arrowstyle='->', width=2, alpha=0.7
-        )
-
-        self.ax_graph.set_title(
-            f'Heap Graph - Step {state.step_number}',
-            fontsize=12, fontweight='bold'
-        )
-        self.ax_graph.axis('off')
+        G, pos = self._graph, self._pos
+        if self._drawn_version != self._graph_version:
+            self._draw_graph_artists(G, pos)
+
+        # Цвета узлов: root > помеченный > текущий при DFS (жёлтый) > живой
+        node_idx = self._node_idx
+        status = np.full(len(node_idx), STATUS_ALIVE, dtype=np.intp)
+        status[node_idx == self._id_to_idx.get(state.current_marking, -1)] = STATUS_CURRENT
+        status[self._is_marked[node_idx]] = STATUS_MARKED
+        status[self._is_root[node_idx]] = STATUS_ROOT
+        node_colors = self._status_rgba[status]
+
+        # Цвета рёбер: по пометке источника; artist'ы перекрашиваются,
+        # только если цвет их ребра изменился
+        edge_color_idx = self._is_marked[self._edge_src_idx].astype(np.intp)
+        for k in np.flatnonzero(edge_color_idx != self._edge_color_idx):
+            self._edge_artists[k].set_color(self._edge_rgba[edge_color_idx[k]])
+        self._edge_color_idx = edge_color_idx
+
+        # Обновить только цвета уже нарисованных artist'ов
+        if self._node_artist is not None:
+            self._node_artist.set_facecolor(node_colors)
+
+        self._title_text.set_text(f'Heap Graph - Step {state.step_number}')
 
         # === Информация справа ===
         info_text = f"""
@@ -442,32 +1160,27 @@ PHASE: {state.phase.upper()}
 
 HEAP STATUS:
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-Total objects: {len([o for o in state.objects.values() if o.is_alive])}
-Root objects: {len([o for o in state.objects.values() if o.is_root and o.is_alive])}
-Marked objects: {len(state.marked_objects)}
-Total memory: {sum(o.size for o in state.objects.values() if o.is_alive)} bytes
+Total objects: {state.alive_count}
+Root objects: {state.root_count}
+Marked objects: {state.marked_count}
+Total memory: {state.total_bytes} bytes
 
 OBJECT DETAILS:
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 """
+        if self._details_text is None:
+            self._details_text = ''.join(self._detail_lines[k] for k in sorted(self._detail_lines))
+        info_text += self._details_text
 
-        for obj_id, obj in sorted(state.objects.items()):
-            if obj.is_alive:
-                status = []
-                if obj.is_root:
-                    status.append('ROOT')
-                if obj.is_marked:
-                    status.append('MARKED')
-                status_str = ' | '.join(status) if status else 'UNMARKED'
-
-                info_text += f"\nobject_{obj_id}: {obj.size} bytes [{status_str}]"
-                if len(obj.references_to) > 0:
-                    refs = ', '.join(f"obj_{r}" for r in sorted(obj.references_to))
-                    info_text += f"\n  → {refs}"
-
-        self.ax_info.text(0.05, 0.95, info_text, transform=self.ax_info.transAxes,
-                         fontsize=9, verticalalignment='top', fontfamily='monospace',
-                         bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.3))
+        self._info_text.set_text(info_text)
+
+        self._blit_artists = [self._title_text, self._info_text,
+                              self.slider.ax, self.substep_slider.ax]
+        if self._node_artist is not None:
+            self._blit_artists.append(self._node_artist)
+        self._blit_artists.extend(self._edge_artists)
+        self._blit_artists.extend(self._label_artists.values())
+        return self._blit_artists
 
     def animate(self):
         """Запустить анимацию"""
@@ -477,6 +1190,7 @@ OBJECT DETAILS:
             self.fig, self._update_frame,
             interval=self.animation_speed,
             repeat=False,
+            blit=True,
             cache_frame_data=False
         )
 
@@ -23,6 +23,12 @@ public:
      */
     explicit EventLogger(const std::string &filename);
 
+    /**
+     * @brief Конструктор с записью в уже открытый поток (например, stdout)
+     * @param stream Поток для логов; должен жить дольше логгера
+     */
+    explicit EventLogger(std::ostream &stream);
+
     /**
      * @brief Деструктор, закрывает файл логов
      */
@@ -63,13 +69,14 @@ public:
     void log_leak(int obj_id);
 
     /**
-     * @brief Проверить, успешно ли открыт файл логов
-     * @return true, если файл открыт
+     * @brief Проверить, успешно ли открыт файл (или поток) логов
+     * @return true, если в лог можно писать
      */
-    bool is_open() const { return file.is_open(); }
+    bool is_open() const { return out == &file ? file.is_open() : out->good(); }
 
 private:
     std::ofstream file;
+    std::ostream *out; ///< Куда пишется лог: file или внешний поток
 
     /**
      * @brief Получить текущее время в ISO формате
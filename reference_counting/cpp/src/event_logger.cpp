@@ -12,7 +12,7 @@ namespace fs = std::filesystem;
 #endif
 #endif
 
-EventLogger::EventLogger(const std::string &filename)
+EventLogger::EventLogger(const std::string &filename) : out(&file)
 {
     // Извлечь директорию из пути к файлу
     size_t last_slash = filename.find_last_of("/\\");
@@ -47,6 +47,10 @@ EventLogger::EventLogger(const std::string &filename)
     }
 }
 
+EventLogger::EventLogger(std::ostream &stream) : out(&stream)
+{
+}
+
 EventLogger::~EventLogger()
 {
     if (file.is_open())
@@ -66,10 +70,10 @@ std::string EventLogger::get_timestamp() const
 
 void EventLogger::write(const std::string &json)
 {
-    if (file.is_open())
+    if (is_open())
     {
-        file << json << "\n";
-        file.flush(); // Убедиться, что данные записаны немедленно
+        *out << json << "\n";
+        out->flush(); // Убедиться, что данные записаны немедленно
     }
 }
 
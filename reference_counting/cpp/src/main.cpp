@@ -3,6 +3,7 @@
 #include <vector>
 #include <filesystem>
 #include <fstream>
+#include <memory>
 #include "rc_heap.h"
 #include "event_logger.h"
 #include "scenario_loader.h"
@@ -11,6 +12,28 @@ namespace fs = std::filesystem;
 
 int main(int argc, char *argv[])
 {
+    // Аргументы: [тип теста] [--scenario=<файл сценария>]
+    //            [--log=<путь к логу> | --log=- (лог в stdout)]
+    std::string testType = "basic";
+    std::string scenarioPath;
+    std::string logTarget;
+    for (int i = 1; i < argc; i++)
+    {
+        std::string arg = argv[i];
+        if (arg.rfind("--scenario=", 0) == 0)
+            scenarioPath = arg.substr(11);
+        else if (arg.rfind("--log=", 0) == 0)
+            logTarget = arg.substr(6);
+        else
+            testType = arg;
+    }
+
+    // При логе в stdout там должны быть только JSON строки событий -
+    // весь остальной вывод перенаправляется в stderr
+    const bool logToStdout = (logTarget == "-");
+    std::ostream eventStream(std::cout.rdbuf());
+    if (logToStdout)
+        std::cout.rdbuf(std::cerr.rdbuf());
 
     std::cout << "\n════════════════════════════════════════════\n";
     std::cout << "🗑️ Reference Counting GC Tester\n";
@@ -24,7 +47,6 @@ int main(int argc, char *argv[])
     std::cout << "Logs dir: " << logsDir << "\n";
 
     // Какой сценарий нужен
-    std::string testType = (argc > 1) ? argv[1] : "basic";
     std::cout << "Test type: " << testType << "\n";
     std::cout << "════════════════════════════════════════════\n\n";
 
@@ -33,14 +55,28 @@ int main(int argc, char *argv[])
     try
     {
         // Создаём logs директорию
-        if (!fs::exists(logsDir))
+        if (!logToStdout && !fs::exists(logsDir))
         {
             fs::create_directories(logsDir);
             std::cout << "📁 Created logs directory\n";
         }
 
         // ЗАГРУЖАЕМ ТОЛЬКО НУЖНЫЙ СЦЕНАРИЙ
-        if (testType == "basic")
+        if (!scenarioPath.empty())
+        {
+            // Файл сценария задан явно
+            try
+            {
+                std::cout << "Loading: " << scenarioPath << "\n";
+                scenarios.push_back(ScenarioLoader::loadScenario(scenarioPath));
+                std::cout << "✅ Loaded\n\n";
+            }
+            catch (const std::exception &e)
+            {
+                std::cerr << "❌ Error: " << e.what() << "\n\n";
+            }
+        }
+        else if (testType == "basic")
         {
             try
             {
@@ -134,17 +170,22 @@ int main(int argc, char *argv[])
             std::cout << "Description: " << scenario.description << "\n";
             std::cout << "════════════════════════════════════════════\n\n";
 
-            std::string logFile = (fs::path(logsDir) / "rc_events.log").string();
-            std::cout << "Log file: " << logFile << "\n";
+            std::string logFile = logTarget.empty()
+                                      ? (fs::path(logsDir) / "rc_events.log").string()
+                                      : logTarget;
+            std::cout << "Log file: " << (logToStdout ? "<stdout>" : logFile) << "\n";
 
             // Очищаем старый лог
-            if (fs::exists(logFile))
+            if (!logToStdout && fs::exists(logFile))
             {
                 fs::remove(logFile);
                 std::cout << "🗑️ Cleaned old log\n";
             }
 
-            EventLogger logger(logFile);
+            std::unique_ptr<EventLogger> loggerPtr =
+                logToStdout ? std::make_unique<EventLogger>(eventStream)
+                            : std::make_unique<EventLogger>(logFile);
+            EventLogger &logger = *loggerPtr;
 
             if (!logger.is_open())
             {
@@ -208,7 +249,11 @@ int main(int argc, char *argv[])
             std::cout << "\n✅ Scenario completed!\n";
 
             // Проверяем что лог создан
-            if (fs::exists(logFile))
+            if (logToStdout)
+            {
+                std::cout << "✅ Log written to stdout\n";
+            }
+            else if (fs::exists(logFile))
             {
                 auto size = fs::file_size(logFile);
                 std::cout << "✅ Log file created: " << size << " bytes\n";
@@ -222,7 +267,8 @@ int main(int argc, char *argv[])
 
         std::cout << "\n════════════════════════════════════════════\n";
         std::cout << "🎉 All tests completed!\n";
-        std::cout << "✅ Logs ready at: " << logsDir << "/rc_events.log\n";
+        if (!logToStdout)
+            std::cout << "✅ Logs ready at: " << (logTarget.empty() ? logsDir + "/rc_events.log" : logTarget) << "\n";
         std::cout << "════════════════════════════════════════════\n\n";
 
         return 0;
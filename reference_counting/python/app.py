@@ -1,12 +1,22 @@
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, render_template, request, jsonify, Response, stream_with_context
 from flask_cors import CORS
+import hashlib
 import json
+import logging
 import os
+import shutil
 import subprocess
 import sys
+import tempfile
+import threading
 from scenario_generator import ScenarioGenerator
 from log_parser import LogParser
 
+try:
+    import orjson
+except ImportError:  # orjson не установлен - сериализуем стандартным json
+    orjson = None
+
 app = Flask(__name__, template_folder='templates', static_folder='static')
 CORS(app)
 
@@ -15,26 +25,132 @@ BASE_DIR = os.path.dirname(os.path.abspath(__file__))  # python/
 PARENT_DIR = os.path.dirname(BASE_DIR)  # reference_counting/
 CPP_DIR = os.path.join(PARENT_DIR, 'cpp')
 SCENARIOS_DIR = os.path.join(PARENT_DIR, 'scenarios')
+# Сгенерированные по запросу сценарии - отдельно от эталонных, вне git
+SCENARIO_CACHE_DIR = os.path.join(SCENARIOS_DIR, 'cache')
 LOGS_DIR = os.path.join(PARENT_DIR, 'logs')
 LOGS_FILE = os.path.join(LOGS_DIR, 'rc_events.log')
 RC_TESTER = os.path.join(CPP_DIR, 'build', 'rc_tester.exe')
 
-# Debug
-print("\n" + "="*70)
-print("🗑️ Reference Counting GC Visualizer")
-print("="*70)
-print(f"BASE_DIR (python): {BASE_DIR}")
-print(f"PARENT_DIR (reference_counting): {PARENT_DIR}")
-print(f"CPP_DIR: {CPP_DIR}")
-print(f"SCENARIOS_DIR: {SCENARIOS_DIR}")
-print(f"LOGS_DIR: {LOGS_DIR}")
-print(f"RC_TESTER: {RC_TESTER}")
-print(f"RC_TESTER exists: {os.path.exists(RC_TESTER)}")
-print("="*70 + "\n")
-
-# Создаём директории
-os.makedirs(SCENARIOS_DIR, exist_ok=True)
-os.makedirs(LOGS_DIR, exist_ok=True)
+# Сколько сценариев держать в кэше - самые давние удаляются
+SCENARIO_CACHE_MAX_FILES = 64
+# Файлы сценариев, которые читает тестер старой сборки (без --scenario=)
+LEGACY_SCENARIO_FILES = {
+    'basic': 'basic.json',
+    'cascade': 'cascade_delete.json',
+    'cycle': 'cycle_leak.json',
+}
+# Сколько секунд ждать C++ тестер
+TESTER_TIMEOUT = 30
+# Сколько секунд даётся прогону с потоковой выдачей: в это время входит и
+# чтение ответа клиентом - пока он не читает, тестер ждёт на заполненном pipe
+TESTER_STREAM_TIMEOUT = 300
+# Отладка: писать лог тестера в LOGS_FILE, а не читать его из stdout процесса
+LOG_TO_FILE = os.environ.get('RC_LOG_TO_FILE') == '1'
+
+_initialized = False
+
+
+def _init_once():
+    """Вывести конфигурацию и создать директории (один раз на процесс-воркер)"""
+    global _initialized
+    if _initialized:
+        return
+    _initialized = True
+
+    # Debug
+    print("\n" + "="*70)
+    print("🗑️ Reference Counting GC Visualizer")
+    print("="*70)
+    print(f"BASE_DIR (python): {BASE_DIR}")
+    print(f"PARENT_DIR (reference_counting): {PARENT_DIR}")
+    print(f"CPP_DIR: {CPP_DIR}")
+    print(f"SCENARIOS_DIR: {SCENARIOS_DIR}")
+    print(f"SCENARIO_CACHE_DIR: {SCENARIO_CACHE_DIR}")
+    print(f"LOGS_DIR: {LOGS_DIR}")
+    print(f"RC_TESTER: {RC_TESTER}")
+    print(f"RC_TESTER exists: {os.path.exists(RC_TESTER)}")
+    print(f"LOG_TO_FILE: {LOG_TO_FILE}")
+    print("="*70 + "\n")
+
+    # Сообщения парсера логов (logging) - в консоль вместе с print
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+
+    # Создаём директории
+    os.makedirs(SCENARIOS_DIR, exist_ok=True)
+    os.makedirs(SCENARIO_CACHE_DIR, exist_ok=True)
+    os.makedirs(LOGS_DIR, exist_ok=True)
+
+
+_init_once()
+
+
+def _ndjson_line(obj):
+    """Одна строка NDJSON ответа (UTF-8 байты с переводом строки)"""
+    if orjson is not None:
+        return orjson.dumps(obj) + b'\n'
+    return (json.dumps(obj, ensure_ascii=False) + '\n').encode('utf-8')
+
+
+def _scenario_file(scenario_type, scenario_args):
+    """Путь к файлу сценария: в имени хэш типа и параметров генерации"""
+    key_data = json.dumps({'t': scenario_type, 'p': scenario_args}, sort_keys=True)
+    key = hashlib.blake2b(key_data.encode('utf-8'), digest_size=8).hexdigest()
+    return os.path.join(SCENARIO_CACHE_DIR, f'{scenario_type}_{key}.json')
+
+
+def _ensure_scenario(kind, n, scenario_file):
+    """Сгенерировать сценарий, если его ещё нет в кэше, и ограничить размер кэша"""
+    try:
+        # Отметить использование - вытесняются давно не нужные сценарии
+        os.utime(scenario_file)
+    except FileNotFoundError:
+        ScenarioGenerator.write_scenario(kind, n, scenario_file)
+        _trim_scenario_cache(keep=scenario_file)
+
+    # Тестер старой сборки игнорирует --scenario= и читает файл с
+    # фиксированным именем - там должна лежать копия текущего сценария
+    shutil.copyfile(scenario_file, os.path.join(SCENARIOS_DIR, LEGACY_SCENARIO_FILES[kind]))
+
+
+def _trim_scenario_cache(keep):
+    """Удалить самые давние сценарии сверх SCENARIO_CACHE_MAX_FILES"""
+    with os.scandir(SCENARIO_CACHE_DIR) as entries:
+        files = [(e.stat().st_mtime, e.path) for e in entries
+                 if e.is_file() and e.name.endswith('.json') and e.path != keep]
+    files.sort()
+    for _, path in files[:max(0, len(files) + 1 - SCENARIO_CACHE_MAX_FILES)]:
+        try:
+            os.remove(path)
+        except OSError:  # файл уже удалён или занят запущенным тестером
+            pass
+
+
+def _mtime_ns(path):
+    """Время изменения файла (None, если файла нет)"""
+    try:
+        return os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def _print_tester_output(returncode, stdout, stderr):
+    """Вывести код возврата и начало вывода C++ тестера"""
+    print(f"Return code: {returncode}")
+    if stdout:
+        print(f"STDOUT:\n{stdout[:1000]}")
+    if stderr:
+        print(f"STDERR:\n{stderr[:1000]}")
+
+
+def _stop_tester(process, stderr_file, watchdog):
+    """Снять тестер и освободить его ресурсы (повторный вызов безопасен)"""
+    watchdog.cancel()
+    if process.poll() is None:
+        process.kill()
+        process.wait()
+    process.stdout.close()
+    stderr_file.close()
+
 
 @app.route('/')
 def index():
@@ -51,32 +167,36 @@ def run_test():
         print(f"\n▶️ Running test: type={scenario_type}, params={params}")
 
         # 1️⃣ ОЧИСТИТЬ СТАРЫЙ ЛОГ
-        if os.path.exists(LOGS_FILE):
-            os.remove(LOGS_FILE)
-            print(f"✅ Cleaned old log file")
+        if LOG_TO_FILE:
+            try:
+                os.remove(LOGS_FILE)
+                print(f"✅ Cleaned old log file")
+            except FileNotFoundError:
+                pass
 
         # 2️⃣ ГЕНЕРИРОВАТЬ ТОЛЬКО ВЫБРАННЫЙ СЦЕНАРИЙ
+        # Файл сценария определяется типом и параметрами: если такой уже
+        # сгенерирован, он переиспользуется без повторной генерации.
+        # Сценарий пишется потоком прямо в JSON, без списка операций в памяти
         print(f"📝 Generating ONLY {scenario_type} scenario with params: {params}")
+        scenario_file = None
 
         if scenario_type == 'basic':
             num_objects = params.get('num_objects', 2)
-            scenario = ScenarioGenerator.generate_basic(num_objects)
-            scenario_file = os.path.join(SCENARIOS_DIR, 'basic.json')
-            ScenarioGenerator.save_scenario(scenario, scenario_file)
+            scenario_file = _scenario_file(scenario_type, {'num_objects': num_objects})
+            _ensure_scenario('basic', num_objects, scenario_file)
             print(f" → Basic: {num_objects} objects ✅")
-            
+
         elif scenario_type == 'cascade':
             depth = params.get('depth', 3)
-            scenario = ScenarioGenerator.generate_cascade(depth)
-            scenario_file = os.path.join(SCENARIOS_DIR, 'cascade_delete.json')
-            ScenarioGenerator.save_scenario(scenario, scenario_file)
+            scenario_file = _scenario_file(scenario_type, {'depth': depth})
+            _ensure_scenario('cascade', depth, scenario_file)
             print(f" → Cascade: depth {depth} ✅")
-            
+
         elif scenario_type == 'cycle':
             num_cycles = params.get('num_cycles', 1)
-            scenario = ScenarioGenerator.generate_cycle(num_cycles)
-            scenario_file = os.path.join(SCENARIOS_DIR, 'cycle_leak.json')
-            ScenarioGenerator.save_scenario(scenario, scenario_file)
+            scenario_file = _scenario_file(scenario_type, {'num_cycles': num_cycles})
+            _ensure_scenario('cycle', num_cycles, scenario_file)
             print(f" → Cycle: {num_cycles} cycles ✅")
 
         # 3️⃣ ЗАПУСТИТЬ C++ ТЕСТЕР
@@ -84,46 +204,125 @@ def run_test():
             print(f"❌ rc_tester.exe not found: {RC_TESTER}")
             return jsonify({'error': 'rc_tester.exe not found'}), 404
 
-        # ✅ ЗАПУСК: exe будет в cpp/, но сценарии в ../scenarios/
+        # ✅ ЗАПУСК: exe будет в cpp/, файл сценария передаётся полным путём
         cmd = [RC_TESTER, scenario_type]
-        print(f"✅ Running: {' '.join(cmd)}")
-        print(f"   from directory: {CPP_DIR}")
-
-        result = subprocess.run(
-            cmd,
-            cwd=CPP_DIR,
-            capture_output=True,
-            text=True,
-            timeout=30,
-            encoding='utf-8',
-            errors='replace'
-        )
-
-        print(f"Return code: {result.returncode}")
-        if result.stdout:
-            print(f"STDOUT:\n{result.stdout[:1000]}")
-        if result.stderr:
-            print(f"STDERR:\n{result.stderr[:1000]}")
-
-        # 4️⃣ ПРОВЕРЯЕМ ЧТО ЛОГ СОЗДАН
-        if not os.path.exists(LOGS_FILE):
-            print(f"⚠️ Log file not found: {LOGS_FILE}")
-            return jsonify({'error': 'Log file not created by C++ program'}), 500
-
-        # 5️⃣ ПАРСИТЬ ЛОГИ
-        events = LogParser.parse_logs(LOGS_FILE)
-        summary = LogParser.get_summary(events)
-
-        print(f"✅ Parsed {len(events)} events")
-        print(f"Summary: {summary}\n")
-
-        return jsonify({
-            'success': True,
-            'type': scenario_type,
-            'params': params,
-            'events': events,
-            'summary': summary
-        })
+        if scenario_file is not None:
+            cmd.append(f'--scenario={scenario_file}')
+        process = None
+        stderr_file = None
+        watchdog = None
+
+        if LOG_TO_FILE:
+            print(f"✅ Running: {' '.join(cmd)}")
+            print(f"   from directory: {CPP_DIR}")
+
+            result = subprocess.run(
+                cmd,
+                cwd=CPP_DIR,
+                capture_output=True,
+                text=True,
+                timeout=TESTER_TIMEOUT,
+                encoding='utf-8',
+                errors='replace'
+            )
+            _print_tester_output(result.returncode, result.stdout, result.stderr)
+
+            # 4️⃣ ПРОВЕРЯЕМ ЧТО ЛОГ СОЗДАН
+            if not os.path.exists(LOGS_FILE):
+                print(f"⚠️ Log file not found: {LOGS_FILE}")
+                return jsonify({'error': 'Log file not created by C++ program'}), 500
+
+            events = LogParser.iter_logs(LOGS_FILE)
+        else:
+            # Лог событий читается из stdout тестера по мере выполнения, без файла.
+            # Остальной вывод тестер пишет в stderr - он уходит во временный файл,
+            # чтобы заполненный pipe не остановил процесс
+            cmd.append('--log=-')
+            print(f"✅ Running: {' '.join(cmd)}")
+            print(f"   from directory: {CPP_DIR}")
+
+            # Тестер старой сборки не знает --log=- и пишет лог в LOGS_FILE -
+            # по времени изменения файла видно, записал ли его этот прогон
+            log_mtime = _mtime_ns(LOGS_FILE)
+
+            stderr_file = tempfile.TemporaryFile(mode='w+', encoding='utf-8', errors='replace')
+            process = subprocess.Popen(
+                cmd,
+                cwd=CPP_DIR,
+                stdout=subprocess.PIPE,
+                stderr=stderr_file
+            )
+            # stdout читается байтами - строки лога сразу уходят в JSON парсер
+            events = LogParser.iter_lines(process.stdout)
+
+            # Зависший тестер не закроет stdout - снять его по таймауту.
+            # Таймер запускается сразу, а не в generate(): клиент может
+            # отключиться до первого события, и генератор не стартует вовсе
+            timed_out = threading.Event()
+
+            def kill_on_timeout():
+                timed_out.set()
+                process.kill()
+
+            watchdog = threading.Timer(TESTER_STREAM_TIMEOUT, kill_on_timeout)
+            watchdog.start()
+
+        # 5️⃣ ПАРСИТЬ ЛОГИ И ОТДАВАТЬ СОБЫТИЯ ПОТОКОМ (NDJSON):
+        # по событию в строке, последней строкой - статистика
+        def generate():
+            summary = LogParser.start_summary()
+
+            try:
+                for event in events:
+                    LogParser.add_to_summary(summary, event)
+                    yield _ndjson_line(event)
+
+                if process is not None:
+                    returncode = process.wait(timeout=TESTER_TIMEOUT)
+                    stderr_file.seek(0)
+                    _print_tester_output(returncode, '', stderr_file.read())
+
+                    # Таймаут - только если тестер и правда снят таймером:
+                    # успевший штатно завершиться прогон таймаутом не считается
+                    if returncode != 0 and timed_out.is_set():
+                        print("❌ Timeout!")
+                        yield _ndjson_line({'error': 'Timeout'})
+                        return
+                    if returncode != 0:
+                        yield _ndjson_line({'error': f'rc_tester failed with code {returncode}'})
+                        return
+
+                    # В stdout не было событий, а лог файл обновлён - тестер
+                    # собран без поддержки --log=-, события читаются из файла
+                    if summary['total_events'] == 0 and _mtime_ns(LOGS_FILE) not in (None, log_mtime):
+                        print(f"⚠️ rc_tester ignored --log=-, reading {LOGS_FILE}")
+                        for event in LogParser.iter_logs(LOGS_FILE):
+                            LogParser.add_to_summary(summary, event)
+                            yield _ndjson_line(event)
+
+                summary = LogParser.finish_summary(summary)
+                print(f"✅ Parsed {summary['total_events']} events")
+                print(f"Summary: {summary}\n")
+
+                yield _ndjson_line({
+                    'success': True,
+                    'type': scenario_type,
+                    'params': params,
+                    'summary': summary
+                })
+            except Exception as e:
+                print(f"❌ Error: {e}")
+                yield _ndjson_line({'error': str(e)})
+            finally:
+                if process is not None:
+                    _stop_tester(process, stderr_file, watchdog)
+
+        response = Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+        if process is not None:
+            # Клиент мог отключиться раньше - сервер закроет ответ,
+            # даже если generate() так и не был запущен
+            response.call_on_close(lambda: _stop_tester(process, stderr_file, watchdog))
+        return response
 
     except subprocess.TimeoutExpired:
         print("❌ Timeout!")
@@ -138,8 +337,10 @@ def run_test():
 @app.route('/api/clear-logs', methods=['POST'])
 def clear_logs():
     try:
-        if os.path.exists(LOGS_FILE):
+        try:
             os.remove(LOGS_FILE)
+        except FileNotFoundError:
+            pass
         return jsonify({'success': True})
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -148,4 +349,5 @@ if __name__ == '__main__':
     print("📍 Запуск сервера на http://localhost:5000")
     print("Откройте браузер и перейдите по адресу выше\n")
     print("Для остановки нажмите Ctrl+C\n")
-    app.run(debug=True, port=5000, host='0.0.0.0')
+    # Для нескольких пользователей - wsgi.py под gunicorn/waitress
+    app.run(debug=False, port=5000, host='0.0.0.0', threaded=True)
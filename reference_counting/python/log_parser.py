@@ -1,7 +1,179 @@
 import json
+import logging
 import os
 from pathlib import Path
 
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:  # orjson не установлен - разбираем стандартным json
+    _json_loads = json.loads
+
+# Сообщения парсера идут в logging: уровень и вывод настраивает вызывающий код
+log = logging.getLogger(__name__)
+
+# Оба парсера принимают строку лога байтами (UTF-8) - лог читается в
+# бинарном режиме без промежуточного декодирования в str
+
+# Первый символ строки события: line[0] у bytes - код байта, у str - символ
+_OBJECT_START = (ord('{'), '{')
+
+# Размер буфера чтения лог файла (байт)
+LOG_READ_BUFFER = 1 << 16
+
+# Кэш разобранных логов: абсолютный путь -> (mtime_ns, size, события).
+# На каждый путь хранится только последняя версия файла
+PARSE_CACHE_SIZE = 32
+_PARSE_CACHE = {}
+
+# ============================================
+# ОБРАБОТЧИКИ СОБЫТИЙ ПО ТИПАМ
+# ============================================
+
+_DEFAULT_ICON = '📌'
+_ALLOC_ICON = '🔵'
+_ROOT_REF_ICON = '🟡'
+_REF_ICON = '➡️'
+_REMOVE_REF_ICON = '⬅️'
+_DELETE_ICON = '⚫'
+_LEAK_ICON = '🔴'
+
+
+# Каждый обработчик собирает событие целиком одним литералом -
+# порядок ключей общий для всех типов
+
+
+def _h_allocate(event_data, index, event_type):
+    """Выделение объекта"""
+    object_id = event_data.get('object')
+    return {
+        'index': index,
+        'type': event_type,
+        'timestamp': event_data.get('timestamp', ''),
+        'description': f"Allocate object #{object_id}",
+        'object_id': object_id,
+        'from_id': None,
+        'to_id': None,
+        'ref_count': None,
+        'status': 'success',
+        'icon': _ALLOC_ICON
+    }
+
+
+def _h_add_ref(event_data, index, event_type):
+    """Добавление ссылки (from=0 - ссылка из корня)"""
+    from_id = event_data.get('from', 0)
+    to_id = event_data.get('to')
+    ref_count = event_data.get('ref_count')
+
+    if from_id == 0:
+        description = f"Add root reference to object #{to_id} (rc={ref_count})"
+        icon = _ROOT_REF_ICON
+    else:
+        description = f"Object #{from_id} → #{to_id} (rc={ref_count})"
+        icon = _REF_ICON
+
+    return {
+        'index': index,
+        'type': event_type,
+        'timestamp': event_data.get('timestamp', ''),
+        'description': description,
+        'object_id': None,
+        'from_id': from_id,
+        'to_id': to_id,
+        'ref_count': ref_count,
+        'status': 'info',
+        'icon': icon
+    }
+
+
+def _h_remove_ref(event_data, index, event_type):
+    """Удаление ссылки (from=0 - ссылка из корня)"""
+    from_id = event_data.get('from', 0)
+    to_id = event_data.get('to')
+    ref_count = event_data.get('ref_count')
+
+    if from_id == 0:
+        description = f"Remove root reference from object #{to_id} (rc={ref_count})"
+    else:
+        description = f"Object #{from_id} ← #{to_id} (rc={ref_count})"
+
+    return {
+        'index': index,
+        'type': event_type,
+        'timestamp': event_data.get('timestamp', ''),
+        'description': description,
+        'object_id': None,
+        'from_id': from_id,
+        'to_id': to_id,
+        'ref_count': ref_count,
+        'status': 'warning',
+        'icon': _REMOVE_REF_ICON
+    }
+
+
+def _h_delete(event_data, index, event_type):
+    """Освобождение объекта"""
+    object_id = event_data.get('object')
+    return {
+        'index': index,
+        'type': event_type,
+        'timestamp': event_data.get('timestamp', ''),
+        'description': f"Delete object #{object_id} (freed)",
+        'object_id': object_id,
+        'from_id': None,
+        'to_id': None,
+        'ref_count': None,
+        'status': 'success',
+        'icon': _DELETE_ICON
+    }
+
+
+def _h_leak(event_data, index, event_type):
+    """Утечка памяти"""
+    object_id = event_data.get('object')
+    return {
+        'index': index,
+        'type': event_type,
+        'timestamp': event_data.get('timestamp', ''),
+        'description': f"⚠️ MEMORY LEAK: Object #{object_id}",
+        'object_id': object_id,
+        'from_id': None,
+        'to_id': None,
+        'ref_count': None,
+        'status': 'error',
+        'icon': _LEAK_ICON
+    }
+
+
+def _h_unknown(event_data, index, event_type):
+    """Неизвестный тип - описание из исходного JSON"""
+    return {
+        'index': index,
+        'type': event_type,
+        'timestamp': event_data.get('timestamp', ''),
+        'description': json.dumps(event_data),
+        'object_id': None,
+        'from_id': None,
+        'to_id': None,
+        'ref_count': None,
+        'status': 'info',
+        'icon': _DEFAULT_ICON
+    }
+
+
+# Статусы узлов графа (коды в столбце статусов)
+_NODE_STATUSES = ('alive', 'deleted', 'leak')
+_NODE_ALIVE, _NODE_DELETED, _NODE_LEAK = range(3)
+
+_HANDLERS = {
+    'allocate': _h_allocate,
+    'add_ref': _h_add_ref,
+    'remove_ref': _h_remove_ref,
+    'delete': _h_delete,
+    'leak': _h_leak,
+}
+
 
 class LogParser:
     """Парсер логов Reference Counting из JSON"""
@@ -15,44 +187,93 @@ class LogParser:
         Returns:
             list: Список событий с деталями
         """
-        events = []
+        # Файл не изменился с прошлого разбора - события берутся из кэша
+        try:
+            st = os.stat(log_file)
+        except OSError:
+            st = None
 
-        # Проверка существования файла
-        if not os.path.exists(log_file):
-            print(f"⚠️ Log file not found: {log_file}")
-            return events
+        if st is None:
+            events = list(LogParser.iter_logs(log_file))
+        else:
+            path = os.path.abspath(log_file)
+            cached = _PARSE_CACHE.get(path)
+            if cached is not None and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+                events = cached[2]
+            else:
+                events = list(LogParser.iter_logs(log_file))
+                _PARSE_CACHE.pop(path, None)
+                if len(_PARSE_CACHE) >= PARSE_CACHE_SIZE:
+                    # Вытесняем самый давно добавленный путь
+                    del _PARSE_CACHE[next(iter(_PARSE_CACHE))]
+                _PARSE_CACHE[path] = (st.st_mtime_ns, st.st_size, events)
+            # Копия списка - вызывающий код не испортит кэш
+            events = list(events)
+
+        log.info("✅ Parsed %d events from log file", len(events))
+        return events
 
+    @staticmethod
+    def iter_logs(log_file):
+        """
+        Читает лог файл построчно и выдаёт события по одному
+        Args:
+            log_file: Путь к файлу логов
+        Yields:
+            dict: Событие с деталями
+        """
+        # Файл открывается сразу, без отдельной проверки существования
         try:
-            with open(log_file, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
-
-            # Если файл пуст
-            if not lines:
-                print(f"⚠️ Log file is empty: {log_file}")
-                return events
-
-            # Парсим каждую строку как JSON
-            for i, line in enumerate(lines):
-                line = line.strip()
-                if not line:
-                    continue
-
-                try:
-                    event_data = json.loads(line)
-                    event = LogParser._convert_event(event_data, i + 1)
-                    if event:
-                        events.append(event)
-                except json.JSONDecodeError as e:
-                    print(f"⚠️ Error parsing line {i + 1}: {e}")
-                    print(f" Content: {line[:100]}")
-                    continue
-
-            print(f"✅ Parsed {len(events)} events from log file")
-            return events
-
-        except Exception as e:
-            print(f"❌ Error reading log file: {e}")
-            return events
+            with open(log_file, 'rb', buffering=LOG_READ_BUFFER) as f:
+                yield from LogParser.iter_lines(f)
+
+                # Если файл пуст (позиция после чтения - без второго прохода)
+                if f.tell() == 0:
+                    log.warning("⚠️ Log file is empty: %s", log_file)
+
+        except FileNotFoundError:
+            log.warning("⚠️ Log file not found: %s", log_file)
+        except OSError as e:
+            log.error("❌ Error reading log file: %s", e)
+
+    @staticmethod
+    def iter_lines(lines):
+        """
+        Выдаёт события из строк JSON лога по мере их поступления
+        Args:
+            lines: Итерируемый источник строк bytes или str (файл, stdout процесса)
+        Yields:
+            dict: Событие с деталями
+        """
+        # Имена, нужные на каждой строке - в локальных переменных
+        json_loads = _json_loads
+        convert_event = LogParser._convert_event
+        object_start = _OBJECT_START
+
+        # Парсим каждую строку как JSON
+        for i, line in enumerate(lines, start=1):
+            line = line.strip()
+            if not line:
+                continue
+
+            # Событие - JSON объект: строки не с '{' пропускаются без вызова
+            # парсера (и без дорогого исключения)
+            if line[0] not in object_start:
+                if log.isEnabledFor(logging.DEBUG):
+                    log.debug("Skipping non-object line %d: %r", i, line[:100])
+                continue
+
+            try:
+                event = convert_event(json_loads(line), i)
+            except ValueError as e:  # JSONDecodeError или битый UTF-8
+                if log.isEnabledFor(logging.WARNING):
+                    if isinstance(line, bytes):
+                        line = line.decode('utf-8', errors='replace')
+                    log.warning("⚠️ Error parsing line %d: %s\n Content: %s", i, e, line[:100])
+                continue
+
+            if event:
+                yield event
 
     @staticmethod
     def _convert_event(event_data, index):
@@ -70,71 +291,11 @@ class LogParser:
         # Определяем тип события - может быть 'event' или 'type'
         event_type = event_data.get('event', event_data.get('type', 'unknown'))
 
-        # Общая структура события
-        event = {
-            'index': index,
-            'type': event_type,
-            'timestamp': event_data.get('timestamp', ''),
-            'description': '',
-            'object_id': None,
-            'from_id': None,
-            'to_id': None,
-            'ref_count': None,
-            'status': 'info',
-            'icon': '📌'
-        }
-
-        # Парсим в зависимости от типа
-        if event_type == 'allocate':
-            event['object_id'] = event_data.get('object')
-            event['description'] = f"Allocate object #{event['object_id']}"
-            event['icon'] = '🔵'
-            event['status'] = 'success'
-
-        elif event_type == 'add_ref':
-            event['from_id'] = event_data.get('from', 0)
-            event['to_id'] = event_data.get('to')
-            event['ref_count'] = event_data.get('ref_count')
-
-            if event['from_id'] == 0:
-                event['description'] = f"Add root reference to object #{event['to_id']} (rc={event['ref_count']})"
-                event['icon'] = '🟡'
-            else:
-                event['description'] = f"Object #{event['from_id']} → #{event['to_id']} (rc={event['ref_count']})"
-                event['icon'] = '➡️'
-
-            event['status'] = 'info'
-
-        elif event_type == 'remove_ref':
-            event['from_id'] = event_data.get('from', 0)
-            event['to_id'] = event_data.get('to')
-            event['ref_count'] = event_data.get('ref_count')
-
-            if event['from_id'] == 0:
-                event['description'] = f"Remove root reference from object #{event['to_id']} (rc={event['ref_count']})"
-                event['icon'] = '⬅️'
-            else:
-                event['description'] = f"Object #{event['from_id']} ← #{event['to_id']} (rc={event['ref_count']})"
-                event['icon'] = '⬅️'
-
-            event['status'] = 'warning'
-
-        elif event_type == 'delete':
-            event['object_id'] = event_data.get('object')
-            event['description'] = f"Delete object #{event['object_id']} (freed)"
-            event['icon'] = '⚫'
-            event['status'] = 'success'
-
-        elif event_type == 'leak':
-            event['object_id'] = event_data.get('object')
-            event['description'] = f"⚠️ MEMORY LEAK: Object #{event['object_id']}"
-            event['icon'] = '🔴'
-            event['status'] = 'error'
-
-        else:
-            event['description'] = json.dumps(event_data)
-
-        return event
+        # Событие собирает обработчик своего типа
+        # Тип может оказаться любым JSON значением (список, объект) - такие
+        # события, как и неизвестные типы, описываются исходным JSON
+        handler = _HANDLERS.get(event_type, _h_unknown) if isinstance(event_type, str) else _h_unknown
+        return handler(event_data, index, event_type)
 
     @staticmethod
     def get_summary(events):
@@ -145,46 +306,80 @@ class LogParser:
         Returns:
             dict: Статистика
         """
-        summary = {
-            'total_events': len(events),
+        summary = LogParser.start_summary()
+        for event in events:
+            LogParser.add_to_summary(summary, event)
+        return LogParser.finish_summary(summary)
+
+    @staticmethod
+    def start_summary():
+        """
+        Создаёт пустую статистику для накопления по мере поступления событий
+        Returns:
+            dict: Статистика без событий
+        """
+        return {
+            'total_events': 0,
             'allocated': 0,
             'deleted': 0,
             'leaks': 0,
             'add_refs': 0,
             'remove_refs': 0,
             'root_refs': 0,
-            'objects_alive': set(),
-            'objects_deleted': set(),
-            'status': '🔵 Running'
+            'objects_alive': [],     # Заполняются в finish_summary()
+            'objects_deleted': [],
+            'status': '🔵 Running',
+            # id объекта -> жив ли он после последнего allocate/delete
+            '_object_alive': {}
         }
 
-        for event in events:
-            event_type = event.get('type', '')
+    @staticmethod
+    def add_to_summary(summary, event):
+        """
+        Учитывает одно событие в статистике
+        Args:
+            summary: Статистика из start_summary()
+            event: Событие из _convert_event (все ключи всегда есть)
+        """
+        summary['total_events'] += 1
+        event_type = event['type']
 
-            if event_type == 'allocate':
-                summary['allocated'] += 1
-                obj_id = event.get('object_id')
-                if obj_id:
-                    summary['objects_alive'].add(obj_id)
-                    summary['objects_deleted'].discard(obj_id)
+        if event_type == 'allocate':
+            summary['allocated'] += 1
+            obj_id = event['object_id']
+            if obj_id:
+                summary['_object_alive'][obj_id] = True
 
-            elif event_type == 'delete':
-                summary['deleted'] += 1
-                obj_id = event.get('object_id')
-                if obj_id:
-                    summary['objects_alive'].discard(obj_id)
-                    summary['objects_deleted'].add(obj_id)
+        elif event_type == 'delete':
+            summary['deleted'] += 1
+            obj_id = event['object_id']
+            if obj_id:
+                summary['_object_alive'][obj_id] = False
 
-            elif event_type == 'leak':
-                summary['leaks'] += 1
+        elif event_type == 'leak':
+            summary['leaks'] += 1
 
-            elif event_type == 'add_ref':
-                if event.get('from_id') == 0:
-                    summary['root_refs'] += 1
-                summary['add_refs'] += 1
+        elif event_type == 'add_ref':
+            if event['from_id'] == 0:
+                summary['root_refs'] += 1
+            summary['add_refs'] += 1
 
-            elif event_type == 'remove_ref':
-                summary['remove_refs'] += 1
+        elif event_type == 'remove_ref':
+            summary['remove_refs'] += 1
+
+    @staticmethod
+    def finish_summary(summary):
+        """
+        Вычисляет итоговый статус и готовит статистику к JSON сериализации
+        Args:
+            summary: Статистика из start_summary()
+        Returns:
+            dict: Статистика
+        """
+        # Живые и удалённые объекты - по последнему событию каждого объекта
+        object_alive = summary.pop('_object_alive')
+        summary['objects_alive'] = [obj_id for obj_id, alive in object_alive.items() if alive]
+        summary['objects_deleted'] = [obj_id for obj_id, alive in object_alive.items() if not alive]
 
         # Вычисляем статус
         if summary['leaks'] > 0:
@@ -194,10 +389,6 @@ class LogParser:
         else:
             summary['status'] = '✅ ALL FREED'
 
-        # Конвертим sets в списки для JSON сериализации
-        summary['objects_alive'] = list(summary['objects_alive'])
-        summary['objects_deleted'] = list(summary['objects_deleted'])
-
         return summary
 
     @staticmethod
@@ -209,66 +400,111 @@ class LogParser:
         Returns:
             dict: Данные для визуализации (nodes, edges)
         """
-        nodes = {}
-        edges = []
-        object_status = {}  # Отслеживаем статус объектов
+        return LogParser.summarize_and_graph(events)[1]
 
+    @staticmethod
+    def summarize_and_graph(events):
+        """
+        Считает статистику и строит граф объектов за один проход по событиям
+        Args:
+            events: Список событий (или любой итерируемый источник)
+        Returns:
+            tuple: (статистика, данные для визуализации)
+        """
+        summary = LogParser.start_summary()
+        add_to_summary = LogParser.add_to_summary
+
+        # Граф хранится по столбцам (Structure of Arrays): строка объекта или
+        # ребра - индекс в параллельных массивах, словари собираются в конце
+        node_iloc = {}               # id объекта -> строка
+        node_ids = []
+        node_status = bytearray()    # коды _NODE_STATUSES
+        node_rc = []
+        node_root = bytearray()
+
+        edge_iloc = {}               # (from, to) -> строка, в порядке появления
+        edge_src = []
+        edge_dst = []
+        edge_rc = []
+
+        # Ключи событий из _convert_event есть всегда - читаем их напрямую
         for event in events:
-            event_type = event.get('type', '')
+            add_to_summary(summary, event)
+            event_type = event['type']
 
             if event_type == 'allocate':
-                obj_id = event.get('object_id')
+                obj_id = event['object_id']
                 if obj_id:
-                    nodes[obj_id] = {
-                        'id': f'obj{obj_id}',
-                        'label': f'Object {obj_id}',
-                        'status': 'alive',
-                        'rc': 0,
-                        'is_root': False
-                    }
-                    object_status[obj_id] = 'alive'
+                    row = node_iloc.get(obj_id)
+                    if row is None:
+                        node_iloc[obj_id] = len(node_ids)
+                        node_ids.append(obj_id)
+                        node_status.append(_NODE_ALIVE)
+                        node_rc.append(0)
+                        node_root.append(0)
+                    else:  # Повторное выделение - объект заново
+                        node_status[row] = _NODE_ALIVE
+                        node_rc[row] = 0
+                        node_root[row] = 0
 
             elif event_type == 'delete':
-                obj_id = event.get('object_id')
-                if obj_id and obj_id in nodes:
-                    nodes[obj_id]['status'] = 'deleted'
-                    object_status[obj_id] = 'deleted'
+                row = node_iloc.get(event['object_id'])
+                if row is not None:
+                    node_status[row] = _NODE_DELETED
 
             elif event_type == 'leak':
-                obj_id = event.get('object_id')
-                if obj_id and obj_id in nodes:
-                    nodes[obj_id]['status'] = 'leak'
-                    object_status[obj_id] = 'leak'
+                row = node_iloc.get(event['object_id'])
+                if row is not None:
+                    node_status[row] = _NODE_LEAK
 
             elif event_type == 'add_ref':
-                from_id = event.get('from_id')
-                to_id = event.get('to_id')
-                ref_count = event.get('ref_count', 0)
-
-                if from_id == 0:  # Root reference
-                    if to_id in nodes:
-                        nodes[to_id]['is_root'] = True
-                        nodes[to_id]['rc'] = ref_count
-                else:  # Object reference
-                    if to_id in nodes:
-                        nodes[to_id]['rc'] = ref_count
-
-                    if from_id and to_id:
-                        edge_id = f'{from_id}-{to_id}'
-                        if not any(e['id'] == edge_id for e in edges):
-                            edges.append({
-                                'id': edge_id,
-                                'source': f'obj{from_id}',
-                                'target': f'obj{to_id}',
-                                'label': f'→ {ref_count}'
-                            })
+                from_id = event['from_id']
+                to_id = event['to_id']
+                ref_count = event['ref_count']
+
+                row = node_iloc.get(to_id)
+                if row is not None:
+                    node_rc[row] = ref_count
+                    if from_id == 0:  # Root reference
+                        node_root[row] = 1
+
+                # Object reference (from=0 - корень, ребра нет)
+                if from_id and to_id:
+                    key = (from_id, to_id)
+                    row = edge_iloc.get(key)
+                    if row is None:
+                        edge_iloc[key] = len(edge_src)
+                        edge_src.append(from_id)
+                        edge_dst.append(to_id)
+                        edge_rc.append(ref_count)
+                    else:  # Повторная ссылка - подпись с актуальным rc
+                        edge_rc[row] = ref_count
 
         # Конвертим в нужный формат
-        graph_nodes = list(nodes.values())
-
-        return {
+        graph_nodes = [
+            {
+                'id': f'obj{obj_id}',
+                'label': f'Object {obj_id}',
+                'status': _NODE_STATUSES[status],
+                'rc': rc,
+                'is_root': bool(is_root)
+            }
+            for obj_id, status, rc, is_root in zip(node_ids, node_status, node_rc, node_root)
+        ]
+        edges = [
+            {
+                'id': f'{from_id}-{to_id}',
+                'source': f'obj{from_id}',
+                'target': f'obj{to_id}',
+                'label': f'→ {ref_count}'
+            }
+            for from_id, to_id, ref_count in zip(edge_src, edge_dst, edge_rc)
+        ]
+
+        graph = {
             'nodes': graph_nodes,
             'edges': edges,
             'object_count': len(graph_nodes),
             'edge_count': len(edges)
-        }
\ No newline at end of file
+        }
+        return LogParser.finish_summary(summary), graph
@@ -1,7 +1,8 @@
 #!/usr/bin/env python3
 """
 Reference Counting GC Visualizer - Entry Point
-Запуск Flask приложения
+Запуск Flask приложения под waitress (если установлен), иначе встроенным
+сервером Flask. FLASK_DEBUG=1 - отладочный сервер Flask с перезагрузкой
 """
 
 import os
@@ -12,6 +13,17 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from app import app
 
+try:
+    from waitress import serve
+except ImportError:  # waitress не установлен - встроенный сервер Flask
+    serve = None
+
+HOST = '0.0.0.0'
+PORT = 5000
+# Потоков обработки запросов у waitress
+SERVER_THREADS = 8
+DEBUG = os.environ.get('FLASK_DEBUG') == '1'
+
 if __name__ == '__main__':
     print("=" * 60)
     print("🗑️  Reference Counting GC Visualizer")
@@ -19,5 +31,10 @@ if __name__ == '__main__':
     print("\n📍 Запуск сервера на http://localhost:5000")
     print("Откройте браузер и перейдите по адресу выше\n")
     print("Для остановки нажмите Ctrl+C\n")
-    
-    app.run(debug=True, port=5000, host='0.0.0.0')
\ No newline at end of file
+
+    if DEBUG:
+        app.run(debug=True, port=PORT, host=HOST)
+    elif serve is not None:
+        serve(app, host=HOST, port=PORT, threads=SERVER_THREADS)
+    else:
+        app.run(debug=False, port=PORT, host=HOST, threaded=True)
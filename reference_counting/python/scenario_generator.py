@@ -1,11 +1,46 @@
 import json
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:  # orjson не установлен - пишем стандартным json
+    orjson = None
+
+
+def _dumps_compact(obj) -> bytes:
+    """JSON без отступов и пробелов (UTF-8 байты)"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
 # scenario_generator.py
 BASE_DIR = Path(__file__).resolve().parent  # .../reference_counting/python
 PARENT_DIR = BASE_DIR.parent                # .../reference_counting
 SCENARIOS_DIR = PARENT_DIR / "scenarios"
 
+# Названия и описания сценариев (общие для dict и потоковой записи)
+_SCENARIO_TEXT = {
+    "basic": ("Basic RC (n={})",
+              "Each object is a root and freed immediately when root is removed"),
+    "cascade": ("Cascade Delete (depth={})",
+                "Removing ROOT triggers cascade delete for all linked objects"),
+    "cycle": ("Circular Reference Leak (cycles={})",
+              "Reference counting cannot collect cycles; intentional leak demonstration"),
+}
+
+# Сколько операций собирается в один блок при потоковой записи
+STREAM_BLOCK_OPERATIONS = 1 << 14
+
+# Шаблоны операций в компактном JSON (тот же вид, что у json/orjson без отступов)
+_OP_ALLOCATE = '{"type":"allocate","object_id":%d}'
+_OP_ADD_ROOT = '{"type":"add_ref","from_id":0,"to_id":%d}'
+_OP_REMOVE_ROOT = '{"type":"remove_ref","from_id":0,"to_id":%d}'
+_OP_ADD_REF = '{"type":"add_ref","from_id":%d,"to_id":%d}'
+
 
 class ScenarioGenerator:
     """
@@ -22,24 +57,22 @@ class ScenarioGenerator:
         Все удаляются сразу когда удаляются roots.
         ✓ ОЖИДАНИЕ: 0 LEAKS
         """
-        operations = []
+        ids = range(1, num_objects + 1)
 
         # 1️⃣ Allocate объекты
-        for i in range(1, num_objects + 1):
-            operations.append({"type": "allocate", "object_id": i})
+        operations = [{"type": "allocate", "object_id": i} for i in ids]
 
         # 2️⃣ Добавить каждый объект как ROOT (rc++)
         # ROOT обозначается как from_id=0
-        for i in range(1, num_objects + 1):
-            operations.append({"type": "add_ref", "from_id": 0, "to_id": i})
+        operations.extend([{"type": "add_ref", "from_id": 0, "to_id": i} for i in ids])
 
         # 3️⃣ Удалить каждый ROOT (rc-- → 0 → delete)
-        for i in range(1, num_objects + 1):
-            operations.append({"type": "remove_ref", "from_id": 0, "to_id": i})
+        operations.extend([{"type": "remove_ref", "from_id": 0, "to_id": i} for i in ids])
 
+        name, description = _SCENARIO_TEXT["basic"]
         return {
-            "name": f"Basic RC (n={num_objects})",
-            "description": "Each object is a root and freed immediately when root is removed",
+            "name": name.format(num_objects),
+            "description": description,
             "operations": operations,
         }
 
@@ -52,25 +85,22 @@ class ScenarioGenerator:
         Когда удаляем ROOT → 1.rc=0 → delete 1 → delete ссылку 1→2 → 2.rc=0 → ...
         ✓ ОЖИДАНИЕ: 0 LEAKS
         """
-        operations = []
-
         # 1️⃣ Allocate объекты
-        for i in range(1, depth + 1):
-            operations.append({"type": "allocate", "object_id": i})
+        operations = [{"type": "allocate", "object_id": i} for i in range(1, depth + 1)]
 
         # 2️⃣ ROOT → первый объект (from_id=0)
         operations.append({"type": "add_ref", "from_id": 0, "to_id": 1})
 
         # 3️⃣ Цепочка: 1 → 2 → 3 → ... → depth
-        for i in range(1, depth):
-            operations.append({"type": "add_ref", "from_id": i, "to_id": i + 1})
+        operations.extend([{"type": "add_ref", "from_id": i, "to_id": i + 1} for i in range(1, depth)])
 
         # 4️⃣ Удаляем ROOT → запускается cascade delete для всей цепочки
         operations.append({"type": "remove_ref", "from_id": 0, "to_id": 1})
 
+        name, description = _SCENARIO_TEXT["cascade"]
         return {
-            "name": f"Cascade Delete (depth={depth})",
-            "description": "Removing ROOT triggers cascade delete for all linked objects",
+            "name": name.format(depth),
+            "description": description,
             "operations": operations,
         }
 
@@ -89,66 +119,149 @@ class ScenarioGenerator:
 
         ✗ ОЖИДАНИЕ: num_cycles*2 LEAKS
         """
-        operations = []
-
         start_id = 1
         total_objects = num_cycles * 2
+        ids = range(start_id, start_id + total_objects)
 
         # 1️⃣ Allocate объекты
-        for i in range(start_id, start_id + total_objects):
-            operations.append({"type": "allocate", "object_id": i})
+        operations = [{"type": "allocate", "object_id": i} for i in ids]
 
         # 2️⃣ ROOT ссылается на ВСЕ объекты (rc++ для каждого)
-        for i in range(start_id, start_id + total_objects):
-            operations.append({"type": "add_ref", "from_id": 0, "to_id": i})
+        operations.extend([{"type": "add_ref", "from_id": 0, "to_id": i} for i in ids])
 
         # 3️⃣ Создаём циклы: пара объектов ссылается друг на друга
         # A ↔ B означает: A → B и B → A
-        for c in range(num_cycles):
-            a = start_id + c * 2  # Первый объект цикла
-            b = a + 1              # Второй объект цикла
+        append = operations.append
+        for a in range(start_id, start_id + total_objects, 2):
+            b = a + 1  # a - первый объект цикла, b - второй
 
             # A → B (rc[B]++)
-            operations.append({"type": "add_ref", "from_id": a, "to_id": b})
+            append({"type": "add_ref", "from_id": a, "to_id": b})
             # B → A (rc[A]++)
-            operations.append({"type": "add_ref", "from_id": b, "to_id": a})
+            append({"type": "add_ref", "from_id": b, "to_id": a})
 
         # 4️⃣ Удаляем ROOT → объекты остаются живыми (УТЕЧКА)
-        for i in range(start_id, start_id + total_objects):
-            operations.append({"type": "remove_ref", "from_id": 0, "to_id": i})
+        operations.extend([{"type": "remove_ref", "from_id": 0, "to_id": i} for i in ids])
 
+        name, description = _SCENARIO_TEXT["cycle"]
         return {
-            "name": f"Circular Reference Leak (cycles={num_cycles})",
-            "description": "Reference counting cannot collect cycles; intentional leak demonstration",
+            "name": name.format(num_cycles),
+            "description": description,
             "operations": operations,
         }
 
     @staticmethod
-    def save_scenario(scenario: dict, filename: str):
-        """Сохраняет JSON сценарий в папку scenarios"""
+    def save_scenario(scenario: dict, filename: str, pretty: bool = False):
+        """
+        Сохраняет JSON сценарий в папку scenarios.
+        По умолчанию пишет компактный JSON (его читает только C++ тестер),
+        pretty=True - с отступами для чтения человеком
+        """
         SCENARIOS_DIR.mkdir(exist_ok=True)
         path = SCENARIOS_DIR / filename
 
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(scenario, f, indent=2)
+        if not pretty:
+            data = _dumps_compact(scenario)
+        elif orjson is not None:
+            data = orjson.dumps(scenario, option=orjson.OPT_INDENT_2)
+        else:
+            data = json.dumps(scenario, indent=2).encode("utf-8")
 
-        return str(path)
+        return ScenarioGenerator._write_atomic(path, lambda f: f.write(data))
 
     @staticmethod
-    def generate_all(basic_n: int = 3, cascade_depth: int = 4, cycle_count: int = 2):
-        """Генерирует и сохраняет все три типа сценариев"""
-        ScenarioGenerator.save_scenario(
-            ScenarioGenerator.generate_basic(basic_n), "basic.json"
+    def write_scenario(kind: str, n: int, filename: str):
+        """
+        Генерирует сценарий kind ('basic', 'cascade', 'cycle') с параметром n
+        и пишет его сразу компактным JSON в папку scenarios - без списка dict
+        операций. Результат побайтно совпадает с save_scenario(generate_*(n))
+        """
+        SCENARIOS_DIR.mkdir(exist_ok=True)
+        path = SCENARIOS_DIR / filename
+        return ScenarioGenerator._write_atomic(
+            path, lambda f: ScenarioGenerator.stream_scenario(f, kind, n)
         )
 
-        ScenarioGenerator.save_scenario(
-            ScenarioGenerator.generate_cascade(cascade_depth), "cascade_delete.json"
-        )
+    @staticmethod
+    def stream_scenario(f, kind: str, n: int):
+        """Пишет сценарий в бинарный файл f блоками JSON байт"""
+        ids = range(1, (2 * n if kind == "cycle" else n) + 1)
+        if kind == "basic":
+            segments = [(_OP_ALLOCATE, ids), (_OP_ADD_ROOT, ids), (_OP_REMOVE_ROOT, ids)]
+        elif kind == "cascade":
+            segments = [
+                (_OP_ALLOCATE, ids),
+                (_OP_ADD_ROOT, (1,)),
+                (_OP_ADD_REF, ((i, i + 1) for i in range(1, n))),
+                (_OP_REMOVE_ROOT, (1,)),
+            ]
+        elif kind == "cycle":
+            # Пара A → B, B → A одной записью
+            pair = _OP_ADD_REF + "," + _OP_ADD_REF
+            segments = [
+                (_OP_ALLOCATE, ids),
+                (_OP_ADD_ROOT, ids),
+                (pair, ((a, a + 1, a + 1, a) for a in range(1, 2 * n, 2))),
+                (_OP_REMOVE_ROOT, ids),
+            ]
+        else:
+            raise ValueError(f"Unknown scenario type: {kind}")
+
+        name, description = _SCENARIO_TEXT[kind]
+        f.write(b'{"name":' + _dumps_compact(name.format(n))
+                + b',"description":' + _dumps_compact(description)
+                + b',"operations":[')
+
+        first = True
+        for template, args in segments:
+            args = iter(args)
+            while True:
+                block = [template % a for a in islice(args, STREAM_BLOCK_OPERATIONS)]
+                if not block:
+                    break
+                if not first:
+                    f.write(b",")
+                f.write(",".join(block).encode("ascii"))
+                first = False
+
+        f.write(b"]}")
 
-        ScenarioGenerator.save_scenario(
-            ScenarioGenerator.generate_cycle(cycle_count), "cycle_leak.json"
-        )
+    @staticmethod
+    def _write_atomic(path: Path, write):
+        """
+        Пишет файл через write(f) во временный файл и подменяет целиком:
+        параллельный запрос не прочитает наполовину записанный сценарий
+        """
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                write(f)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+        return str(path)
 
+    @staticmethod
+    def generate_all(basic_n: int = 3, cascade_depth: int = 4, cycle_count: int = 2):
+        """
+        Генерирует и сохраняет все три типа сценариев (с отступами - файлы
+        лежат в репозитории). Файлы пишутся параллельно в потоках
+        """
+        jobs = [
+            (ScenarioGenerator.generate_basic(basic_n), "basic.json"),
+            (ScenarioGenerator.generate_cascade(cascade_depth), "cascade_delete.json"),
+            (ScenarioGenerator.generate_cycle(cycle_count), "cycle_leak.json"),
+        ]
+
+        with ThreadPoolExecutor(max_workers=len(jobs)) as executor:
+            futures = [
+                executor.submit(ScenarioGenerator.save_scenario, scenario, filename, pretty=True)
+                for scenario, filename in jobs
+            ]
+            # result() пробрасывает ошибку записи любого из файлов
+            return [future.result() for future in futures]
 
 if __name__ == "__main__":
     ScenarioGenerator.generate_all()
@@ -178,16 +178,21 @@ async function runTest() {
             body: JSON.stringify({ type: scenarioType, params: params })
         });
 
-        const data = await response.json();
+        // Ошибки до запуска теста приходят обычным JSON, события - потоком NDJSON
+        let data;
+        if ((response.headers.get('Content-Type') || '').includes('application/x-ndjson')) {
+            data = await readEventStream(response);
+        } else {
+            data = await response.json();
+        }
         console.log('✅ Ответ получен:', data);
 
         if (data.success) {
             currentData = data;
-            allEvents = data.events || [];
             currentStepIndex = 0;
             
             updateStatistics(data.summary);
-            updateEventsTable(data.events);
+            updateEventsTable(allEvents);
             updateStepIndicator();
             updateStatus(`✅ Готово. Всего ${allEvents.length} событий. Нажми "Следующий шаг"`);
             
@@ -202,6 +207,40 @@ async function runTest() {
     }
 }
 
+async function readEventStream(response) {
+    // Читаем NDJSON по мере поступления: события складываем в allEvents,
+    // последняя строка - статистика (или ошибка)
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder('utf-8');
+    let buffer = '';
+    let result = { error: 'Поток событий оборвался' };
+
+    const handleLine = (line) => {
+        if (!line.trim()) return;
+        const item = JSON.parse(line);
+        if ('summary' in item || 'error' in item) {
+            result = item;
+        } else {
+            allEvents.push(item);
+        }
+    };
+
+    while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+
+        buffer += decoder.decode(value, { stream: true });
+        const lines = buffer.split('\n');
+        buffer = lines.pop();
+        lines.forEach(handleLine);
+        updateStatus(`⏳ Загрузка данных... ${allEvents.length} событий`);
+    }
+    buffer += decoder.decode();
+    handleLine(buffer);
+
+    return result;
+}
+
 function nextStep() {
     if (allEvents.length === 0) {
         updateStatus('⚠️ Сначала запусти тест');
@@ -0,0 +1,16 @@
+#!/usr/bin/env python3
+"""
+Reference Counting GC Visualizer - WSGI Entry Point
+Запуск под production WSGI сервером (несколько воркеров/потоков), например:
+
+    gunicorn -w 4 -k gthread --threads 2 -b 0.0.0.0:5000 wsgi:app
+    waitress-serve --listen=0.0.0.0:5000 --threads=8 wsgi:app
+"""
+
+import os
+import sys
+
+# Добавить текущую директорию в PYTHONPATH
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import app